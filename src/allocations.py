@@ -0,0 +1,188 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Allocation and garbage collection profiler.
+
+Set the ALLOCATIONS_VARIABLE environment variable to a file name to record
+the net memory growth of the game every ALLOCATIONS_GROWTH_SAMPLE ticks, the
+garbage collection pauses and the tick they landed on, and every
+ALLOCATIONS_SAMPLE ticks the memory held by the subsystems that registered
+with watch. The report is written there when the game exits.
+
+Growth is what is still held at the end of a sample less what was held at its
+start, short lived allocations freed within it do not show. With tracemalloc
+it is attributed to the line that allocated the memory and gc.callbacks times
+the collections. Without them (Python 2) it is the growth of the garbage
+collected objects by type, and automatic garbage collection is disabled for
+the whole run: the collection is instead run at the end of the ticks where
+it is due so that it can be timed."""
+
+import atexit, gc, os, sys, timeit
+from collections import defaultdict
+from constants import (ALLOCATIONS_VARIABLE, ALLOCATIONS_SAMPLE,
+                       ALLOCATIONS_GROWTH_SAMPLE, ALLOCATIONS_FRAMES)
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+timer = timeit.default_timer
+path = os.environ.get(ALLOCATIONS_VARIABLE)
+enabled = bool(path)
+tick = 0
+# Net growth in bytes (or objects without tracemalloc) of each site or type
+sites = defaultdict(int)
+# (tick, net growth in bytes or objects) of every sample ending at tick
+samples = []
+# (tick, generation, seconds) of every collection
+pauses = []
+# Subsystem name to a function returning the objects it holds
+watched = {}
+# Subsystem name to (tick, bytes) samples
+memory = defaultdict(list)
+previous = None
+collecting = None
+
+def watch(name, roots):
+    """Sample the memory held by the objects roots() returns"""
+    watched[name] = roots
+
+def start():
+    if tracemalloc is not None:
+        tracemalloc.start(ALLOCATIONS_FRAMES)
+    if hasattr(gc, 'callbacks'):
+        gc.callbacks.append(on_gc)
+    else:
+        gc.disable()
+
+def on_gc(phase, info):
+    global collecting
+    if phase == 'start':
+        collecting = timer()
+    elif collecting is not None:
+        pauses.append((tick, info['generation'], timer() - collecting))
+        collecting = None
+
+def collect_due():
+    """Run the collection the interpreter would have run by now, if any"""
+    counts = gc.get_count()
+    thresholds = gc.get_threshold()
+    for generation in (2, 1, 0):
+        if counts[generation] > thresholds[generation]:
+            began = timer()
+            gc.collect(generation)
+            pauses.append((tick, generation, timer() - began))
+            return
+
+def snapshot():
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__)])
+
+def census():
+    """Number of garbage collected objects of each type"""
+    count = defaultdict(int)
+    for o in gc.get_objects():
+        count[type(o).__name__] += 1
+    return count
+
+def grown():
+    """Record the net growth since the last call and return the total. The
+first call only takes the state to compare the next ones with"""
+    global previous
+    total = 0
+    if tracemalloc is not None:
+        current = snapshot()
+        if previous is None:
+            previous = current
+        for stat in current.compare_to(previous, 'lineno'):
+            if stat.size_diff > 0:
+                sites[str(stat.traceback)] += stat.size_diff
+                total += stat.size_diff
+    else:
+        current = census()
+        if previous is None:
+            previous = current
+        for name, count in current.items():
+            growth = count - previous.get(name, 0)
+            if growth > 0:
+                sites[name] += growth
+                total += growth
+    previous = current
+    return total
+
+def deep_size(roots):
+    """Bytes of roots and of everything they reach, except classes, modules
+and functions that are shared by the whole game"""
+    seen = set()
+    pending = list(roots)
+    total = 0
+    while pending:
+        o = pending.pop()
+        if id(o) in seen or isinstance(o, SHARED):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o, 0)
+        pending.extend(gc.get_referents(o))
+    return total
+
+SHARED = (type, type(sys), type(deep_size), type(deep_size.__code__))
+
+def end_tick():
+    """Close a tick of the level update"""
+    global tick
+    if not hasattr(gc, 'callbacks'):
+        collect_due()
+    if tick % ALLOCATIONS_GROWTH_SAMPLE == 0:
+        samples.append((tick, grown()))
+    if tick % ALLOCATIONS_SAMPLE == 0:
+        for name, roots in watched.items():
+            memory[name].append((tick, deep_size(roots())))
+    tick += 1
+
+def report(out):
+    unit = 'bytes' if tracemalloc is not None else 'objects'
+    n = max(samples[-1][0], 1)
+    out.write('Net growth in {0} per tick by {1}\n'.format(
+        unit, 'call site' if tracemalloc is not None else 'type'))
+    top = sorted(sites.items(), key=lambda s: -s[1])[:30]
+    for site, total in top:
+        out.write('{0:12.1f} {1}\n'.format(float(total) / n, site))
+    out.write('\nGarbage collections: {0}, {1:.2f}ms in total\n'.format(
+        len(pauses), sum(p[2] for p in pauses) * 1000))
+    out.write('tick generation ms\n')
+    for t, generation, seconds in sorted(pauses, key=lambda p: -p[2])[:30]:
+        out.write('{0} {1} {2:.3f}\n'.format(t, generation, seconds * 1000))
+    out.write('\nMemory per subsystem in bytes: first, last, growth\n')
+    for name, sizes in sorted(memory.items()):
+        first, last = sizes[0][1], sizes[-1][1]
+        out.write('{0:<20} {1} {2} {3:+d}\n'.format(name, first, last,
+                                                     last - first))
+    out.write('\nNet growth in {0} over the {1} ticks up to tick\n'.format(
+        unit, ALLOCATIONS_GROWTH_SAMPLE))
+    for t, total in samples[1:]:
+        out.write('{0} {1}\n'.format(t, total))
+
+def write():
+    if enabled and samples:
+        with open(path, 'w') as f:
+            report(f)
+
+if enabled:
+    start()
+    atexit.register(write)
@@ -0,0 +1,110 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Factory of the visual primitives used by the game.
+
+When HEADLESS is set no GL resource is ever created, stand-ins with the same
+attributes are returned instead so that levels can run without a window."""
+
+import pyglet
+
+HEADLESS = False
+# Metrics of a single character of the object font in headless mode
+GLYPH_WIDTH = 8
+GLYPH_HEIGHT = 16
+
+class HeadlessLabel(object):
+    """Stand-in for pyglet.text.Label"""
+    def __init__(self, text = '', x = 0, y = 0, color = (255, 255, 255, 255),
+                 **kwargs):
+        self.text = text
+        self.x = x
+        self.y = y
+        self.color = color
+    @property
+    def content_width(self):
+        return len(self.text) * GLYPH_WIDTH
+    @property
+    def content_height(self):
+        return GLYPH_HEIGHT if self.text else 0
+    def draw(self):
+        pass
+    def delete(self):
+        pass
+
+class HeadlessSprite(object):
+    """Stand-in for pyglet.sprite.Sprite"""
+    def __init__(self, image, x = 0, y = 0, batch = None, group = None):
+        self.image = image
+        self.x = x
+        self.y = y
+        self.batch = batch
+        self.color = (255, 255, 255)
+        self.opacity = 255
+        self.visible = True
+    def set_position(self, x, y):
+        self.x = x
+        self.y = y
+    def draw(self):
+        pass
+    def delete(self):
+        pass
+
+class HeadlessVertexList(object):
+    """Stand-in for pyglet.graphics.vertexdomain.VertexList"""
+    def __init__(self, count, *data):
+        self.count = count
+        self.vertices = []
+        self.colors = []
+        for fmt, values in data:
+            if fmt.startswith('v'):
+                self.vertices = list(values)
+            elif fmt.startswith('c'):
+                self.colors = list(values)
+    def draw(self, mode):
+        pass
+    def delete(self):
+        pass
+
+class HeadlessBatch(object):
+    """Stand-in for pyglet.graphics.Batch"""
+    def add(self, count, mode, group, *data):
+        return HeadlessVertexList(count, *data)
+    def migrate(self, vertex_list, mode, group, batch):
+        pass
+    def draw(self):
+        pass
+
+def label(*args, **kwargs):
+    if HEADLESS:
+        return HeadlessLabel(*args, **kwargs)
+    return pyglet.text.Label(*args, **kwargs)
+
+def sprite(image, x, y, batch = None, group = None):
+    if HEADLESS:
+        return HeadlessSprite(image, x, y, batch, group)
+    return pyglet.sprite.Sprite(image, x, y, batch=batch, group=group)
+
+def vertex_list(count, *data):
+    if HEADLESS:
+        return HeadlessVertexList(count, *data)
+    return pyglet.graphics.vertex_list(count, *data)
+
+def batch():
+    if HEADLESS:
+        return HeadlessBatch()
+    return pyglet.graphics.Batch()
@@ -0,0 +1,232 @@
+#!/bin/python
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks of the simulation loop.
+
+Every scenario builds a level, steps Level.update for a number of ticks with
+the hero patrolling and reports the tick rate, tick duration percentiles and
+peak memory. Results can be saved as JSON baselines and later compared
+against them:
+
+    $ python benchmark.py --save
+    $ python benchmark.py --compare level1-wolves-100
+"""
+
+import random
+# The levels place their pathways at random when they are imported, seed it
+# first so that every run benchmarks the same layout
+random.seed(0)
+import headless
+import argparse, json, math, multiprocessing, os, sys, timeit
+from functools import partial
+from collections import OrderedDict
+from headless import Simulation
+from constants import Controls
+from events import GameOver
+from room import Room, MagneticPathway
+from level import Level
+from level_util import ASC_STAIRS
+from stage_objects import LEVELS
+import events, level1, store
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, 'benchmarks')
+DEFAULT_TICKS = 500
+TOLERANCE = 0.1
+
+def patrol_script(ticks, hold = 20):
+    """Walk in a square and attack every now and then, never interacting so
+that the hero stays in the level"""
+    directions = [Controls.NORTH, Controls.EAST, Controls.SOUTH, Controls.WEST]
+    script = []
+    for n, tick in enumerate(range(0, ticks, hold)):
+        d = directions[n % len(directions)]
+        script.append((tick, d, True))
+        script.append((tick + hold, d, False))
+        script.append((tick, Controls.ATTACK, n % 2 == 0))
+    return script
+
+def wolf_level(n):
+    """Level 1 with n more wolves. A den connected to the room of the wolves
+makes space for them when the level itself is too small.
+
+The den is more than ACTIVE_SECTOR_DEPTH sectors away from the room of the
+hero, so most of its wolves stay dormant: of the 1000 only a dozen are active
+on average and the scenario mostly measures how cheaply dormant creatures are
+skipped, which is why it runs faster than 100 wolves"""
+    if n <= 100:
+        return partial(level1.LEVEL, creatures=[(level1.WOLF, n)])
+    side = int(math.sqrt(n * 1000))
+    den = Room(460, 150, side, side)
+    return partial(
+        level1.LEVEL,
+        rooms=[level1.room1, level1.room2, level1.room3, level1.room4, den],
+        pathways=[level1.p1, level1.p2, MagneticPathway(level1.room2, den)],
+        creatures=[(level1.WOLF, n)])
+
+def room_chain_level(n, columns = 10, size = 60, gap = 60):
+    """n rooms in rows of columns rooms. Rooms of a row are joined left to
+right and the rows are joined through their first room"""
+    rooms = []
+    pathways = []
+    step = size + 2 * gap
+    for i in range(n):
+        row, column = divmod(i, columns)
+        start = i == 0
+        room = Room(column * step, row * step, size, size, start=start,
+                    creatures=[(level1.WOLF, 2)] if not start else [])
+        if column > 0:
+            pathways.append(MagneticPathway(rooms[-1], room))
+        elif row > 0:
+            pathways.append(MagneticPathway(rooms[i - columns], room))
+        rooms.append(room)
+    r = rooms[0].inner_rect
+    stairs = partial(ASC_STAIRS, x_=r.left + 5, y_=r.bottom + 5)
+    return partial(Level, objects=[stairs], rooms=rooms, pathways=pathways,
+                   creatures=[], triggers=[])
+
+SCENARIOS = OrderedDict([
+    ('level1', lambda: LEVELS[0]),
+    ('level2', lambda: LEVELS[1]),
+    ('level1-wolves-10', lambda: wolf_level(10)),
+    ('level1-wolves-100', lambda: wolf_level(100)),
+    ('level1-wolves-1000', lambda: wolf_level(1000)),
+    ('rooms-50', lambda: room_chain_level(50)),
+])
+
+def peak_memory():
+    """Peak memory of the process in kilobytes"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def percentile(values, p):
+    ordered = sorted(values)
+    k = int(round((len(ordered) - 1) * p / 100.0))
+    return ordered[k]
+
+def positive(value):
+    """argparse type of an integer of at least 1"""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError('{0} is not at least 1'.format(value))
+    return n
+
+def run(name, ticks, seed = 0):
+    """Run a scenario for at least one tick and return its results"""
+    random.seed(seed)
+    if store.numpy is not None:
+        store.numpy.random.seed(seed)
+    events.clear()
+    sim = Simulation(patrol_script(ticks), level=SCENARIOS[name]())
+    level = sim.level()
+    timer = timeit.default_timer
+    times = []
+    over = []
+    for i in range(ticks):
+        sim.keys.advance()
+        start = timer()
+        level.update()
+        times.append(timer() - start)
+        events.dispatch({GameOver: over.append})
+        events.clear()
+        if over:
+            break
+    total = sum(times)
+    return OrderedDict([
+        ('scenario', name),
+        ('ticks', len(times)),
+        ('creatures', len(level.creatures)),
+        ('ticks_per_sec', len(times) / total),
+        ('p50_ms', percentile(times, 50) * 1000),
+        ('p90_ms', percentile(times, 90) * 1000),
+        ('p99_ms', percentile(times, 99) * 1000),
+        ('max_ms', max(times) * 1000),
+        ('peak_memory_kb', peak_memory()),
+        ('python', sys.version.split()[0]),
+    ])
+
+def _run_child(args):
+    return run(*args)
+
+def run_isolated(name, ticks, seed = 0):
+    """Run a scenario in a fresh process so that peak memory and module
+level state of a scenario do not leak into the next one"""
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.map(_run_child, [(name, ticks, seed)])[0]
+    finally:
+        pool.close()
+        pool.join()
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, name + '.json')
+
+def save(result):
+    if not os.path.isdir(BASELINE_DIR):
+        os.makedirs(BASELINE_DIR)
+    with open(baseline_path(result['scenario']), 'w') as fil:
+        json.dump(result, fil, indent=2)
+
+def compare(result):
+    """Return the relative change in tick rate against the saved baseline or
+None if there is no baseline"""
+    path = baseline_path(result['scenario'])
+    if not os.path.exists(path):
+        return None
+    with open(path) as fil:
+        baseline = json.load(fil)
+    return result['ticks_per_sec'] / baseline['ticks_per_sec'] - 1.0
+
+def main(args):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS),
+                        help='scenarios to run, all by default')
+    parser.add_argument('--ticks', type=positive, default=DEFAULT_TICKS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the new baselines')
+    parser.add_argument('--compare', action='store_true',
+                        help='fail if a scenario is slower than its baseline')
+    opts = parser.parse_args(args)
+    regressions = []
+    for name in opts.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario {0}'.format(name))
+        result = run_isolated(name, opts.ticks, opts.seed)
+        line = ('{scenario:20} {ticks:6} ticks {ticks_per_sec:9.1f} ticks/s '
+                'p50 {p50_ms:7.2f}ms p90 {p90_ms:7.2f}ms p99 {p99_ms:7.2f}ms '
+                'peak {peak_memory_kb}KB').format(**result)
+        if opts.compare:
+            change = compare(result)
+            if change is not None:
+                line += ' {0:+.1%}'.format(change)
+                if change < -TOLERANCE:
+                    regressions.append(name)
+        print(line)
+        if opts.save:
+            save(result)
+    if regressions:
+        print('Slower than baseline: ' + ', '.join(regressions))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -33,11 +33,32 @@ NORMAL_DIFICULTY = True
 GAME_NAME = 'GAME 3'
 OBJECT_FONT_FACE = 'Monospace'
 INTERVAL = 0.1
+# Most ticks run by one update of the game when it falls behind
+MAX_CATCHUP = 5
+# Ticks summarized by the profiler overlay and the file of its tick log
+PROFILE_WINDOW = 50
+PROFILE_FILE = 'profile.csv'
+# Environment variable holding the file the trace of the game is written to
+TRACE_VARIABLE = 'GAME3_TRACE'
+# Environment variable holding the file the allocation report is written to,
+# ticks between two samples of the memory of the subsystems and frames of the
+# call sites
+ALLOCATIONS_VARIABLE = 'GAME3_ALLOCATIONS'
+ALLOCATIONS_SAMPLE = 100
+ALLOCATIONS_GROWTH_SAMPLE = 10
+ALLOCATIONS_FRAMES = 1
 VICTORY = 'YOU WIN!'
 GAME_OVER = 'GAME OVER'
 ROAM_LIST = [-1, 0, 1]
 ROAM_RATE = 0.1
 HITBOX_GAP = 3
+SPATIAL_CELL_SIZE = 32
+FOG_CACHE_SIZE = 4096
+# Creatures besides the hero a level needs for their AI to run on the numpy
+# column store, below it updating them one by one is faster
+CREATURE_STORE_MIN = 50
+# Creatures more sectors (rooms or pathways) away from the hero are dormant
+ACTIVE_SECTOR_DEPTH = 2
 BACKGROUND_COLOR = [0, 0, 0, 0]
 class Direction(object):
     NORTH = 'N'
@@ -78,6 +99,7 @@ class Controls(object):
     ACCEPT = key.I
     SCROLL_UP = key.PAGEUP
     SCROLL_DOWN = key.PAGEDOWN
+    PROFILE = key.F3
 kss = key.symbol_string
 MOVE_AROUND_MESSAGE = 'Use the {0} {1} {2} {3} keys to move around'.format(
     kss(Controls.WEST),
@@ -15,20 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import pyglet, pickle, cloud
+import pyglet, pickle, cloud, events, allocations
+from tracing import traced
 from util import Reactable
 from hero import Hero
-from exception import (
-    NextLevel,
-    GameOver,
-    PreviousLevel,
-    StartGame,
-    BackOneScreen,
-    QuitGame,
-    AutoSave)
+from exception import StartGame, BackOneScreen, QuitGame
+from events import NextLevel, GameOver, PreviousLevel, AutoSave
 from screens import CommonScreen
 from stage_objects import LEVELS
-from constants import INTERVAL
+from constants import INTERVAL, MAX_CATCHUP
 from decorations import autoset
 from menu import QUIT_SUBSCRIPTIONS, VICTORY_SCREEN, DEFEAT_SCREEN, MAIN_MENU
 
@@ -39,6 +34,8 @@ class GameController(Reactable):
         self.defeat = DEFEAT_SCREEN
         self.screens = [MAIN_MENU]
         self.subs = QUIT_SUBSCRIPTIONS
+        # Time not yet simulated
+        self.lag = 0.0
     def top_screen(self):
         return self.screens[-1]
     def add_screen(self, screen):
@@ -59,29 +56,48 @@ class GameController(Reactable):
     def quit(self):
         """Politely exit the game"""
         pyglet.app.exit()
+    @traced('GameController.draw', 'render')
     def draw(self):
         """Draws the current screen"""
-        self.top_screen().draw()
+        screen = self.top_screen()
+        screen.alpha = min(self.lag / INTERVAL, 1.0)
+        screen.draw()
+    @traced('GameController.save')
     def save(self):
         with open('save_file.bin', 'wb') as fil:
             self.game_state.get_level().unset_visual()
             cloud.serialization.cloudpickle.dump(self.game_state, fil)
             self.game_state.get_level().set_visual()
+    @traced('GameController.update')
     def update(self, dt):
-        """Update the game"""
+        """Run one tick every INTERVAL seconds of dt, carrying the rest over
+to the next update. At most MAX_CATCHUP ticks are run, if the game falls
+further behind the time it could not catch up is dropped"""
+        self.lag += dt
+        ticks = 0
         try:
-            for i in range(int(dt // INTERVAL)):
-                self.top_screen().update()
-        except GameOver as ex:
-            self.back_one_screen()
-            if ex.defeat:
-                self.add_screen(self.defeat)
-            else:
-                self.add_screen(self.victory)
+            while self.lag >= INTERVAL:
+                if ticks == MAX_CATCHUP:
+                    self.lag %= INTERVAL
+                    break
+                screen = self.top_screen()
+                screen.update()
+                self.lag -= INTERVAL
+                ticks += 1
+                events.dispatch({GameOver: self.game_over,
+                                 AutoSave: lambda ev: self.save()})
+                if self.top_screen() is not screen:
+                    self.lag = 0.0
+                    break
         except StartGame as ex:
+            self.lag = 0.0
             self.start_game(ex.dificulty)
-        except AutoSave:
-            self.save()
+    def game_over(self, ev):
+        self.back_one_screen()
+        if ev.defeat:
+            self.add_screen(self.defeat)
+        else:
+            self.add_screen(self.victory)
     def react(self, key, modifiers):
         """Calls default reactions and screen specific reactions to keyboard
 events"""
@@ -101,28 +117,32 @@ class GameState(object):
         if levels is None:
             self.levels = [LEVELS[current_level](hero)]
         self.messages = []
+        if allocations.enabled:
+            allocations.watch('retained levels', lambda: self.levels)
+            allocations.watch('fog', lambda: [l.fog for l in self.levels])
+    @traced('GameState.goto_next_level')
     def goto_next_level(self):
-        """Move to the next level or end the game"""
+        """Move to the next level and save the game or end the game"""
         self.get_level().unset_visual()
         self.current_level += 1
         try:
             level = LEVELS[self.current_level]
         except IndexError:
-            raise GameOver(False)
+            events.emit(GameOver(False))
+            return
         self.levels.append(level(self.hero))
+        events.emit(AutoSave())
+    @traced('GameState.goto_prev_level')
     def goto_prev_level(self):
         """Move to the previous level"""
         self.current_level -= 1
         self.get_level().set_visual()
     def get_level(self):
         return self.levels[self.current_level]
+    @traced('GameState.update')
     def update(self):
-        try:
-            self.get_level().update()
-        except NextLevel:
-            self.goto_next_level()
-            raise AutoSave()
-        except PreviousLevel:
-            self.goto_prev_level()
+        self.get_level().update()
+        events.dispatch({NextLevel: lambda ev: self.goto_next_level(),
+                         PreviousLevel: lambda ev: self.goto_prev_level()})
 
 state = GameController()
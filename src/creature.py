@@ -15,7 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import random
+import random, glyphs
 from obj import Object, empty_interaction
 from exception import CreatureDeath
 from constants import (
@@ -30,6 +30,14 @@ from function import from_probability_to_bool
 
 class Creature(Object):
     """Actual creature on the screen"""
+    __slots__ = ('health_value', 'speed', 'strength', 'light_radius',
+                 'attack_type', 'stationary', 'hostile', 'cooldown_', 'roaming',
+                 'intended_x', 'intended_y', 'target',
+                 'last_desired_direction_value', 'change_countdown_value',
+                 'last_desired_speed_value', 'health_total',
+                 'cooldown_value', 'facing', 'hitbox', 'shown_', 'store', 'row',
+                 'target_distance', 'router', 'sector', 'dormant_value')
+    group = glyphs.CREATURE_GROUP
     @autoset
     def __init__(
             self,
@@ -60,8 +68,13 @@ class Creature(Object):
             color=color,
             delayed=delayed
         )
-        self.intended_x = self.x_
-        self.intended_y = self.y_
+        self.store = None
+        self.target_distance = None
+        self.router = None
+        self.sector = None
+        self.dormant = False
+        self.intended_x = self.x
+        self.intended_y = self.y
         self.target = None
         self.last_desired_direction = [0, 0]
         self.change_countdown = 0
@@ -71,6 +84,84 @@ class Creature(Object):
         self.facing = [None, Direction.NORTH]
         self.hitbox = None
         self.visible_ = DEBUG
+    @property
+    def health(self):
+        if self.store is None:
+            return self.health_value
+        return int(self.store.health[self.row])
+    @health.setter
+    def health(self, value):
+        if getattr(self, 'store', None) is None:
+            self.health_value = value
+        else:
+            self.store.health[self.row] = value
+    @property
+    def cooldown(self):
+        if self.store is None:
+            return self.cooldown_value
+        return int(self.store.cooldown[self.row])
+    @cooldown.setter
+    def cooldown(self, value):
+        if getattr(self, 'store', None) is None:
+            self.cooldown_value = value
+        else:
+            self.store.cooldown[self.row] = value
+    @property
+    def dormant(self):
+        if self.store is None:
+            return self.dormant_value
+        return not self.store.active[self.row]
+    @dormant.setter
+    def dormant(self, value):
+        if self.store is None:
+            self.dormant_value = value
+        else:
+            self.store.active[self.row] = not value
+    @property
+    def last_desired_direction(self):
+        if self.store is None:
+            return self.last_desired_direction_value
+        return [int(self.store.dx[self.row]), int(self.store.dy[self.row])]
+    @last_desired_direction.setter
+    def last_desired_direction(self, value):
+        if self.store is None:
+            self.last_desired_direction_value = value
+        else:
+            self.store.dx[self.row], self.store.dy[self.row] = value
+    @property
+    def change_countdown(self):
+        if self.store is None:
+            return self.change_countdown_value
+        return int(self.store.countdown[self.row])
+    @change_countdown.setter
+    def change_countdown(self, value):
+        if self.store is None:
+            self.change_countdown_value = value
+        else:
+            self.store.countdown[self.row] = value
+    @property
+    def last_desired_speed(self):
+        if self.store is None:
+            return self.last_desired_speed_value
+        return int(self.store.pace[self.row])
+    @last_desired_speed.setter
+    def last_desired_speed(self, value):
+        if self.store is None:
+            self.last_desired_speed_value = value
+        else:
+            self.store.pace[self.row] = value
+    def detach(self):
+        """Copy the state kept in the creature store back and stop being a view
+on it"""
+        store, i = self.store, self.row
+        self.health_value = int(store.health[i])
+        self.cooldown_value = int(store.cooldown[i])
+        self.last_desired_direction_value = [int(store.dx[i]),
+                                             int(store.dy[i])]
+        self.last_desired_speed_value = int(store.pace[i])
+        self.change_countdown_value = int(store.countdown[i])
+        self.dormant_value = not store.active[i]
+        self.store = None
     def be_attacked(self, other):
         """Be attacked by another creature"""
         self.health -= other.strength
@@ -102,14 +193,20 @@ was moving before."""
         return self.change_countdown > 0
     def within_range(self, obj = None):
         if obj is None:
-            return super(Creature, self).within_range(self.target)
+            return self.target_within(self.range)
         else:
             return super(Creature, self).within_range(obj)
     def visible(self, obj):
         """Return true if obj is visible to self"""
         return self.within_distance(obj, self.light_radius)
     def target_visible(self):
-        return self.visible(self.target)
+        return self.target_within(self.light_radius)
+    def target_within(self, distance):
+        """If the target is at most distance away. Uses the distance measured
+by the level for this tick when there is one"""
+        if self.target_distance is None:
+            return self.within_distance(self.target, distance)
+        return self.target_distance <= distance + max(self.h, self.w) / 2
     def roam(self):
         """Move randomly"""
         x, y = self.x, self.y
@@ -124,11 +221,10 @@ was moving before."""
             (self.last_desired_direction[1] * self.last_desired_speed) + y)
     def set_last_desired_direction(self, dx, dy, speed):
         """Set the last direction followed and the time until change"""
-        self.last_desired_direction[0] = dx
-        self.last_desired_direction[1] = dy
+        self.last_desired_direction = [dx, dy]
         self.last_desired_speed = speed
         self.change_countdown = self.light_radius
-        self.set_facing(self.last_desired_direction)
+        self.set_facing([dx, dy])
     def set_facing(self, direction):
         if direction == [0, 0]:
             return
@@ -164,12 +260,19 @@ was moving before."""
             y += self.h + HITBOX_GAP
         elif self.facing[1] == Direction.SOUTH:
             y -=  h + HITBOX_GAP
-        self.hitbox = self.attack_type(self, x, y, w, h)
+        self.hitbox = self.attack_type.acquire(self, x, y, w, h)
     def chase(self):
-        """Chase and set the last desired point"""
-        dx, dy = self.target_direction()
+        """Chase and set the last desired point. Heads for the waypoint given
+by the router when the target is out of reach in a straight line"""
+        waypoint = None if self.router is None else self.router(self)
+        if waypoint is None:
+            x, y = self.target.x, self.target.y
+        else:
+            x, y = waypoint
+        dx = cmp(0, self.x - x)
+        dy = cmp(0, self.y - y)
         self.set_last_desired_direction(dx, dy, self.speed)
-        self.move_towards(self.target.x, self.target.y)
+        self.move_towards(x, y)
     def target_direction(self):
         dx = cmp(0, self.x - self.target.x)
         dy = cmp(0, self.y - self.target.y)
@@ -185,10 +288,25 @@ was moving before."""
         self.intent(nx, ny)
     def set_location(self, x, y):
         super(Creature, self).set_location(x, y)
+        if self.store is not None:
+            self.store.x[self.row] = x
+            self.store.y[self.row] = y
         self.intent(x, y)
     def intent(self, x, y):
         self.intended_x = x
         self.intended_y = y
+    def set_visual(self, batch):
+        super(Creature, self).set_visual(batch)
+        self.sprite.visible = self.visible_
+    @property
+    def visible_(self):
+        return self.shown_
+    @visible_.setter
+    def visible_(self, value):
+        self.shown_ = value
+        sprite = getattr(self, 'sprite', None)
+        if sprite is not None:
+            sprite.visible = value
     def draw(self):
         if self.visible_:
             super(Creature, self).draw()
@@ -16,25 +16,41 @@
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
 import inspect, functools
-def _autoset(init, self, *args, **kwargs):
+
+def _binder(init):
+    """Function with the signature of init that sets its arguments as
+attributes of self and then calls init. It is generated once per decorated
+init so that creating an object does not inspect it again"""
     spec = inspect.getargspec(init)
-    argval = {}
+    args = spec.args[1:]
+    if spec.varargs is not None or spec.keywords is not None:
+        return _generic_binder(init, spec)
+    lines = ['def {0}({1}):'.format(init.__name__, ', '.join(spec.args))]
+    for name in args:
+        lines.append('    {0}.{1} = {1}'.format(spec.args[0], name))
+    lines.append('    return autoset_wrapped({0})'.format(', '.join(spec.args)))
+    namespace = {'autoset_wrapped': init}
+    exec('\n'.join(lines) + '\n', namespace)
+    wrapper = namespace[init.__name__]
+    wrapper.__defaults__ = spec.defaults
+    return wrapper
+
+def _generic_binder(init, spec):
+    """Binder for an init that takes *args or **kwargs"""
+    defaults = {}
     if spec.defaults is not None:
-        for i in range(len(spec.defaults), 0, -1):
-            name = spec.args[-i]
-            argval[name] = spec.defaults[-i]
-    for i in range(len(args)):
-        argval[spec.args[i + 1]] = args[i]
-    for n in kwargs:
-        argval[n] = kwargs[n]
-    for n in argval:
-        self.__setattr__(n, argval[n])
+        defaults = dict(zip(spec.args[-len(spec.defaults):], spec.defaults))
+    names = spec.args[1:]
+    def wrapper(self, *args, **kwargs):
+        argval = dict(defaults)
+        argval.update(zip(names, args))
+        argval.update(kwargs)
+        for n in argval:
+            self.__setattr__(n, argval[n])
+        init(self, *args, **kwargs)
+    return wrapper
 
 def autoset(f):
     """Decoration that turns all arguments of an init function
 into attributes of the created object."""
-    @functools.wraps(f)
-    def wrapper(self, *args, **kwargs):
-        _autoset(f, self, *args, **kwargs)
-        f(self, *args, **kwargs)
-    return wrapper
+    return functools.update_wrapper(_binder(f), f)
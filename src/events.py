@@ -0,0 +1,112 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Game events.
+
+Anything may emit events, they wait in a queue until the level, the game
+state or the controller drain it. Each of them dispatches the events it knows
+about and leaves the others for the next one."""
+
+import tracing
+from collections import deque
+from decorations import autoset
+
+queue = deque()
+
+def emit(event):
+    """Queue an event, the events of an EventList are queued one by one"""
+    if isinstance(event, EventList):
+        for e in event.events:
+            emit(e)
+    else:
+        queue.append(event)
+
+def dispatch(table):
+    """Call table[type(event)](event) for the queued events, in the order they
+were emitted. Events without a handler stay queued, events emitted by the
+handlers are dispatched as well"""
+    kept = []
+    while queue:
+        event = queue.popleft()
+        handler = table.get(type(event))
+        if handler is None:
+            kept.append(event)
+        elif tracing.enabled:
+            name = type(event).__name__
+            tracing.begin(name, 'event')
+            handler(event)
+            tracing.end(name, 'event')
+        else:
+            handler(event)
+    queue.extend(kept)
+
+def clear():
+    queue.clear()
+
+class ReplaceObject(object):
+    @autoset
+    def __init__(self, this, that):
+        pass
+
+class CreateObject(object):
+    @autoset
+    def __init__(self, obj):
+        pass
+
+class AppendMessage(object):
+    @autoset
+    def __init__(self, message):
+        pass
+
+class EventList(object):
+    """An event that has a list of events"""
+    def __init__(self, *events):
+        self.events = events
+
+class AddPathway(object):
+    @autoset
+    def __init__(self, pathway):
+        pass
+
+class RemovePathway(object):
+    @autoset
+    def __init__(self, pathway):
+        pass
+
+class NextLevel(object):
+    pass
+
+class PreviousLevel(object):
+    pass
+
+class AutoSave(object):
+    pass
+
+class GameOver(object):
+    @autoset
+    def __init__(self, defeat):
+        pass
+
+class HeroMoved(object):
+    @autoset
+    def __init__(self, hero):
+        pass
+
+class CreatureDied(object):
+    @autoset
+    def __init__(self, creature):
+        pass
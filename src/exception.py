@@ -38,53 +38,12 @@ class Fadeout(Exception):
 class SubscriptionFound(Exception):
     pass
 
-class NextLevel(Exception):
-    pass
-
-class PreviousLevel(Exception):
-    pass
-
 class CreatureDeath(Exception):
     pass
 
-class GameOver(Exception):
-    @autoset
-    def __init__(self, defeat):
-        pass
-
 class ImpossiblePathwayException(Exception):
     pass
 
-class ReplaceObject(Exception):
-    @autoset
-    def __init__(self, this, that):
-        pass
-
-class CreateObject(Exception):
-    @autoset
-    def __init__(self, obj):
-        pass
-
 class AnimationEnd(Exception):
     pass
 
-class AppendMessage(Exception):
-    pass
-
-class EventList(Exception):
-    """An event that has a list of events"""
-    def __init__(self, *events):
-        self.events = events
-
-class AddPathway(Exception):
-    @autoset
-    def __init__(self, pathway):
-        pass
-
-class RemovePathway(Exception):
-    @autoset
-    def __init__(self, pathway):
-        pass
-
-class AutoSave(Exception):
-    pass
@@ -15,90 +15,219 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import pyglet, math
-from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+"""Fog of war.
 
-def get_tile(x, y, tile_size, group, batch):
-    vl = batch.add(
-        6, pyglet.gl.GL_QUAD_STRIP, group,
-        ('v2i', (x, y, x, y,
-                 x + tile_size, y,
-                 x, y + tile_size,
-                 x + tile_size, y + tile_size,
-                 x + tile_size, y + tile_size
-             ))
-    )
-    vl.x = x
-    vl.y = y
-    vl.explored = 0
-    return vl
+The state of every tile is a byte of a bytearray, rows from the bottom up.
+The fog is drawn as a single alpha texture with one texel per tile, shared
+by the fogs of all levels. Walls cast shadows: a tile is only visible when
+it can be seen from the tile of the hero through floor tiles."""
 
-class FogGroup(pyglet.graphics.Group):
-    def __init__(self,  alpha):
-        self.alpha = alpha
-        super(FogGroup, self).__init__()
-    def set_state(self):
-        pyglet.gl.glColor4ub(0, 0, 0, self.alpha)
-    def unset_state(self):
-        pyglet.gl.glColor4ub(0, 0, 0, 0)
+import pyglet, math, backend
+from pyglet import gl
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT, FOG_CACHE_SIZE
+
+UNEXPLORED = 0
+VISIBLE = 1
+EXPLORED = 2
+ALPHA = {UNEXPLORED: 255, VISIBLE: 0, EXPLORED: 100}
+ALPHA_TABLE = bytes(bytearray(ALPHA.get(i, 255) for i in range(256)))
+# Transforms of the first octant into the eight octants around a tile
+OCTANTS = [(1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1)]
+# The four 2 bit tile states held by each packed byte
+UNPACK_TABLE = [bytes(bytearray([b & 3, (b >> 2) & 3, (b >> 4) & 3, b >> 6]))
+                for b in range(256)]
 
 x = 0
 y = 50
 w = WINDOW_WIDTH - x
 h = WINDOW_HEIGHT - y
-unexplored_group = FogGroup(255)
-explored_group = FogGroup(100)
-visible_group = FogGroup(0)
-batch = pyglet.graphics.Batch()
 tile_size = 5
-matrix = [[get_tile(j, i, tile_size, unexplored_group, batch)
-                for j in range(x, w, tile_size)]
-               for i in range(y, h, tile_size)]
+columns = len(range(x, w, tile_size))
+rows = len(range(y, h, tile_size))
+texture = None
+# Fog whose state is currently in the texture
+shown = None
 
-def draw():
-    batch.draw()
+def pack(state):
+    """Pack tile states at 2 bits per tile"""
+    state = state + bytearray(-len(state) % 4)
+    return bytearray(a | b << 2 | c << 4 | d << 6 for a, b, c, d in
+                     zip(state[0::4], state[1::4], state[2::4], state[3::4]))
 
-def tile_visible_from(x, y, light_radius, tile):
-    x1 = tile.vertices[0]
-    y1 = tile.vertices[1]
-    return math.hypot(x - x1, y - y1) <= light_radius
+def unpack(packed, size):
+    return bytearray(b''.join(UNPACK_TABLE[b] for b in packed))[:size]
 
-def save():
-    return [[j.explored for j in i] for i in matrix]
+def visible_spans(px, py, light_radius):
+    """Spans of tiles whose lower left corner is at most light_radius away
+from (px, py)"""
+    spans = []
+    first = max(int(math.ceil(float(py - light_radius - y) / tile_size)), 0)
+    last = min(int(math.floor(float(py + light_radius - y) / tile_size)),
+               rows - 1)
+    for j in range(first, last + 1):
+        dy = py - (y + j * tile_size)
+        half = math.sqrt(max(light_radius ** 2 - dy ** 2, 0))
+        i1 = max(int(math.ceil(float(px - half - x) / tile_size)), 0)
+        i2 = min(int(math.floor(float(px + half - x) / tile_size)),
+                 columns - 1)
+        if i1 <= i2:
+            spans.append((j * columns + i1, j * columns + i2 + 1))
+    return spans
 
-def reset():
-    for i in matrix:
-        for j in i:
-            batch.migrate(j, pyglet.gl.GL_QUAD_STRIP, unexplored_group, batch)
+def tile_range(low, high, origin, count):
+    """First and last tiles whose centers are between low and high"""
+    half = tile_size / 2.0
+    first = max(int(math.ceil((low - origin - half) / tile_size)), 0)
+    last = min(int(math.floor((high - origin - half) / tile_size)), count - 1)
+    return first, last
 
-def load(mat):
-    for i in range(len(mat)):
-        for j in range(len(mat[i])):
-            g = mat[i][j]
-            if g == 0:
-                group = unexplored_group
-            elif g == 2:
-                group = explored_group
-            else:
-                group = visible_group
-            batch.migrate(matrix[i][j], pyglet.gl.GL_QUAD_STRIP, group, batch)
+def occluders(places):
+    """Tiles that block the light, the ones covered by walls but not by the
+floor of any room or pathway"""
+    opaque = bytearray(columns * rows)
+    places = list(places)
+    walls = [r for p in places for r in p.wall_rects()]
+    floors = [p.inner_rect for p in places]
+    for value, rects in ((1, walls), (0, floors)):
+        for r in rects:
+            i1, i2 = tile_range(r.left, r.right, x, columns)
+            j1, j2 = tile_range(r.bottom, r.top, y, rows)
+            if i1 <= i2:
+                run = bytearray([value]) * (i2 - i1 + 1)
+                for j in range(j1, j2 + 1):
+                    opaque[j * columns + i1:j * columns + i2 + 1] = run
+    return opaque
 
-def update(x, y, light_radius):
-    margin = 10
-    i1 = (x / tile_size) - (light_radius / tile_size) - margin
-    j1 = (y / tile_size) - (light_radius / tile_size) - margin
-    i1 = max(i1, 0)
-    j1 = max(j1, 0)
-    i2 = i1 + 15 + margin
-    j2 = j1 + 5 + margin
-    i2 = min(i2, len(matrix[0]))
-    j2 = min(j2, len(matrix))
-    for i in range(i1, i2):
-        for j in range(j1, j2):
-            t = matrix[j][i]
-            if tile_visible_from(x, y, light_radius, t):
-                batch.migrate(t, pyglet.gl.GL_QUAD_STRIP, visible_group, batch)
-                t.explored = 1
-            elif t.explored == 1:
-                batch.migrate(t, pyglet.gl.GL_QUAD_STRIP, explored_group, batch)
-                t.explored = 2
+def shadowcast(opaque, oi, oj, radius):
+    """Indices of the tiles seen from tile (oi, oj) up to radius tiles away,
+using recursive shadowcasting over the eight octants"""
+    seen = set()
+    if 0 <= oi < columns and 0 <= oj < rows:
+        seen.add(oj * columns + oi)
+    def cast(row, start, end, xx, xy, yx, yy):
+        if start < end:
+            return
+        new_start = start
+        for depth in range(row, radius + 1):
+            blocked = False
+            dy = -depth
+            for dx in range(-depth, 1):
+                left = (dx - 0.5) / (dy + 0.5)
+                right = (dx + 0.5) / (dy - 0.5)
+                if start < right:
+                    continue
+                if end > left:
+                    break
+                i = oi + dx * xx + dy * xy
+                j = oj + dx * yx + dy * yy
+                inside = 0 <= i < columns and 0 <= j < rows
+                if inside:
+                    seen.add(j * columns + i)
+                wall = not inside or opaque[j * columns + i]
+                if blocked:
+                    if wall:
+                        new_start = right
+                    else:
+                        blocked = False
+                        start = new_start
+                elif wall and depth < radius:
+                    blocked = True
+                    cast(depth + 1, start, left, xx, xy, yx, yy)
+                    new_start = right
+            if blocked:
+                break
+    for xx, xy, yx, yy in OCTANTS:
+        cast(1, 1.0, 0.0, xx, xy, yx, yy)
+    return seen
+
+class Fog(object):
+    """Explored and visible tiles of a level"""
+    def __init__(self):
+        self.state = bytearray(columns * rows)
+        self.packed = None
+        # Spans (start, stop) of state currently visible
+        self.lit = []
+        self.dirty = True
+        self.opaque = bytearray(columns * rows)
+        # Visible spans by tile of the hero and light radius
+        self.cache = {}
+        self.origin = None
+    def set_occluders(self, places):
+        """Take the walls of places as the tiles that cast shadows"""
+        self.opaque = occluders(places)
+        self.cache.clear()
+        self.origin = None
+    def suspend(self):
+        """Keep the tiles packed while the level is not shown. The occluders
+are dropped too and have to be set again after resuming"""
+        if self.state is not None:
+            self.packed = pack(self.state)
+            self.state = None
+        self.opaque = None
+        self.cache.clear()
+        self.origin = None
+    def resume(self):
+        if self.packed is not None:
+            self.state = unpack(self.packed, columns * rows)
+            self.packed = None
+        self.dirty = True
+    def paint(self, spans, value):
+        for start, stop in spans:
+            self.state[start:stop] = bytearray([value]) * (stop - start)
+    def visible_from(self, oi, oj, light_radius):
+        """Spans of tiles lit from the lower left corner of tile (oi, oj)"""
+        seen = shadowcast(self.opaque, oi, oj,
+                          int(light_radius // tile_size) + 1)
+        spans = []
+        for start, stop in visible_spans(x + oi * tile_size,
+                                         y + oj * tile_size, light_radius):
+            first = None
+            for k in range(start, stop):
+                if k in seen:
+                    if first is None:
+                        first = k
+                elif first is not None:
+                    spans.append((first, k))
+                    first = None
+            if first is not None:
+                spans.append((first, stop))
+        return spans
+    def update(self, px, py, light_radius):
+        """Light the tiles seen from the tile at (px, py). Moving inside the
+same tile costs nothing and tiles visited before are served from a cache"""
+        origin = (int((px - x) // tile_size), int((py - y) // tile_size),
+                  light_radius)
+        if origin == self.origin:
+            return
+        self.origin = origin
+        spans = self.cache.get(origin)
+        if spans is None:
+            if len(self.cache) >= FOG_CACHE_SIZE:
+                self.cache.clear()
+            spans = self.cache[origin] = self.visible_from(*origin)
+        self.paint(self.lit, EXPLORED)
+        self.lit = spans
+        self.paint(self.lit, VISIBLE)
+        self.dirty = True
+    def draw(self):
+        global texture, shown
+        if backend.HEADLESS:
+            return
+        if texture is None or self.dirty or shown is not self:
+            image = pyglet.image.ImageData(
+                columns, rows, 'A', bytes(self.state.translate(ALPHA_TABLE)))
+            if texture is None:
+                texture = image.get_texture()
+                gl.glBindTexture(texture.target, texture.id)
+                gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER,
+                                   gl.GL_NEAREST)
+                gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MIN_FILTER,
+                                   gl.GL_NEAREST)
+            else:
+                texture.blit_into(image, 0, 0, 0)
+            self.dirty = False
+            shown = self
+        gl.glColor4ub(0, 0, 0, 255)
+        texture.blit(x, y, width=columns * tile_size, height=rows * tile_size)
+        gl.glColor4ub(255, 255, 255, 255)
@@ -17,7 +17,7 @@
 
 """Utility functions"""
 
-import pyglet, random
+import pyglet, random, backend, events
 
 from constants import (
     WINDOW_WIDTH,
@@ -71,7 +71,7 @@ def range_inc(*args):
 
 def vertex_list_from_rect(x, y, w, h, color = (0, 0, 255, 255)):
     r, g, b, a = color
-    return pyglet.graphics.vertex_list(
+    return backend.vertex_list(
         4, ('v2i', (x,     y,
                     x + w, y,
                     x,     y + h,
@@ -82,6 +82,17 @@ def vertex_list_from_rect(x, y, w, h, color = (0, 0, 255, 255)):
                  r, g, b, a)
         ))
 
+def quad_from_rect(batch, group, x, y, w, h, color = (0, 0, 255, 255)):
+    """Add a rect to a batch as an independent quad"""
+    r, g, b, a = color
+    return batch.add(
+        4, pyglet.gl.GL_QUADS, group,
+        ('v2i', (x,     y,
+                 x + w, y,
+                 x + w, y + h,
+                 x,     y + h)),
+        ('c4B', (r, g, b, a) * 4))
+
 def fadeout(alpha):
     """Makes the entire screen fadeout"""
     bg = BACKGROUND_COLOR[:]
@@ -94,22 +105,11 @@ def from_probability_to_bool(rate):
     """Return True rate percent of the time"""
     return random.random() <= rate
 
-def movements(x, y , intended_x, intended_y):
-    """Iterator function that returns all the possible positions in the
-    intended direction"""
-    if x == intended_x and y == intended_y:
-        raise StopIteration()
-    for i in reversed(range_inc(x,
-                                intended_x)):
-        for j in reversed(range_inc(y,
-                                    intended_y)):
-            yield (i, j)
-
-def raise_ev(ev_cls, *args):
-    """returns a function raises the given exception with the arguments
+def emit_ev(ev_cls, *args):
+    """returns a function that emits the given event with the arguments
     passed"""
     def f(self):
-        raise ev_cls(*args)
+        events.emit(ev_cls(*args))
     return f
 
 def on_off_switch(f1, f2):
@@ -0,0 +1,89 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Symbols of objects and creatures drawn as sprites.
+
+The object font is rasterized once into pyglet's glyph atlas, every symbol is
+then a sprite of an atlas region so a whole level draws in a single batch."""
+
+import pyglet, backend
+from constants import OBJECT_FONT_FACE, OBJECT_FONT_SIZE
+
+OBJECT_GROUP = pyglet.graphics.OrderedGroup(0)
+CREATURE_GROUP = pyglet.graphics.OrderedGroup(1)
+# Characters rasterized up front
+PRELOADED = ''.join(chr(c) for c in range(32, 127))
+
+font = None
+glyphs = {}
+sizes = {}
+
+def get_font():
+    global font
+    if font is None:
+        font = pyglet.font.load(OBJECT_FONT_FACE, OBJECT_FONT_SIZE)
+        for c, g in zip(PRELOADED, font.get_glyphs(PRELOADED)):
+            glyphs[c] = g
+    return font
+
+def glyph(symbol):
+    """Atlas region of a single character, None in headless mode"""
+    if backend.HEADLESS:
+        return None
+    g = glyphs.get(symbol)
+    if g is None:
+        g = glyphs[symbol] = get_font().get_glyphs(symbol)[0]
+    return g
+
+def size(symbol):
+    """Width and height of the layout a label of symbol would have"""
+    s = sizes.get(symbol)
+    if s is None:
+        if backend.HEADLESS:
+            s = (len(symbol) * backend.GLYPH_WIDTH, backend.GLYPH_HEIGHT)
+        else:
+            f = get_font()
+            s = (sum(glyph(c).advance for c in symbol), f.ascent - f.descent)
+        sizes[symbol] = s
+    return s
+
+class Symbol(object):
+    """Sprite of a character placed like the baseline of a label at x, y"""
+    def __init__(self, symbol, color, x, y, batch = None, group = None):
+        g = glyph(symbol)
+        self.x, self.y = x, y
+        if g is None:
+            self.dx, self.dy = 0, 0
+        else:
+            self.dx, self.dy = g.vertices[0], g.vertices[1]
+        self.sprite = backend.sprite(g, x + self.dx, y + self.dy,
+                                     batch, group)
+        self.sprite.color = color[:3]
+        self.sprite.opacity = color[3]
+    def set_position(self, x, y):
+        self.x, self.y = x, y
+        self.sprite.set_position(x + self.dx, y + self.dy)
+    @property
+    def visible(self):
+        return self.sprite.visible
+    @visible.setter
+    def visible(self, value):
+        self.sprite.visible = value
+    def draw(self):
+        self.sprite.draw()
+    def delete(self):
+        self.sprite.delete()
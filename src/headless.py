@@ -0,0 +1,117 @@
+#!/bin/python
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Simulation of the game without a window or GL context.
+
+This module has to be imported before any other game module, since some of
+them build visual resources at import time."""
+
+import pyglet
+pyglet.options['shadow_window'] = False
+pyglet.options['headless'] = True
+import backend
+backend.HEADLESS = True
+
+import random, sys, time
+import events
+from control import GameState
+from hero import Hero
+from constants import Controls, NORMAL_DIFICULTY
+from events import AutoSave, GameOver
+
+class ScriptedKeyStateHandler(dict):
+    """Stand-in for pyglet's KeyStateHandler. The script is a list of
+(tick, symbol, pressed) entries applied when the handler reaches that tick"""
+    def __init__(self, script = ()):
+        self.script = sorted(script, key=lambda e: e[0])
+        self.position = 0
+        self.tick = 0
+    def __getitem__(self, key):
+        return self.get(key, False)
+    def press(self, symbol):
+        self[symbol] = True
+    def release(self, symbol):
+        self.pop(symbol, None)
+    def advance(self):
+        """Apply the entries of the current tick and move to the next one"""
+        while (self.position < len(self.script)
+               and self.script[self.position][0] <= self.tick):
+            tick, symbol, pressed = self.script[self.position]
+            if pressed:
+                self.press(symbol)
+            else:
+                self.release(symbol)
+            self.position += 1
+        self.tick += 1
+
+def random_script(ticks, seed = None, hold = 10):
+    """A script that wanders around, attacks and interacts at random"""
+    rng = random.Random(seed)
+    keys = [Controls.NORTH, Controls.SOUTH, Controls.EAST, Controls.WEST,
+            Controls.ATTACK, Controls.ACCEPT]
+    script = []
+    for tick in range(0, ticks, hold):
+        for k in keys:
+            script.append((tick, k, rng.random() < 0.3))
+    return script
+
+class Simulation(object):
+    """A game played by a key script instead of a keyboard"""
+    def __init__(self, script = (), level = None,
+                 dificulty = NORMAL_DIFICULTY):
+        self.keys = ScriptedKeyStateHandler(script)
+        self.hero = Hero(self.keys)
+        if level is None:
+            self.state = GameState(dificulty, self.hero)
+        else:
+            self.state = GameState(dificulty, self.hero,
+                                   levels=[level(self.hero)])
+        self.ticks = 0
+        self.result = None
+    def level(self):
+        return self.state.get_level()
+    def step(self):
+        """Advance the game by one tick"""
+        self.keys.advance()
+        self.state.update()
+        events.dispatch({AutoSave: lambda ev: None,
+                         GameOver: self.game_over})
+        self.ticks += 1
+    def game_over(self, ev):
+        self.result = 'defeat' if ev.defeat else 'victory'
+    def run(self, ticks):
+        """Advance at most ticks ticks, stopping early if the game ends"""
+        for i in range(ticks):
+            if self.result is not None:
+                break
+            self.step()
+        return self.ticks
+
+def main(args):
+    ticks = int(args[0]) if args else 1000
+    seed = int(args[1]) if len(args) > 1 else None
+    sim = Simulation(random_script(ticks, seed))
+    start = time.time()
+    sim.run(ticks)
+    elapsed = time.time() - start
+    print('{0} ticks in {1:.3f}s ({2:.1f} ticks/s), level {3}, {4}'.format(
+        sim.ticks, elapsed, sim.ticks / max(elapsed, 1e-9),
+        sim.state.current_level + 1, sim.result or 'still playing'))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -15,16 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import pyglet
+import pyglet, backend
 from pyglet import gl
 from creature import Creature
 from decorations import autoset
 from util import MeleeHitbox, Move
 from constants import Direction, Controls, HERO_ID, Color
-from exception import CreatureDeath, GameOver, AnimationEnd
+from exception import CreatureDeath, AnimationEnd
+from events import GameOver, emit
 
 class Hero(Creature):
     """Player controlable character"""
+    __slots__ = ('khandler', 'inv', 'intended_interact', 'animation', 'arrow')
     @autoset
     def __init__(self, khandler, inv = None):
         super(Hero, self).__init__(
@@ -49,9 +51,9 @@ class Hero(Creature):
         if inv is None:
             self.inv = []
         self.visible_ = True
-    def set_visual(self):
+    def set_visual(self, batch):
         """Method that sets the visual representation of an object"""
-        super(Hero, self).set_visual()
+        super(Hero, self).set_visual(batch)
         self.arrow = self.get_arrow()
     def unset_visual(self):
         """Method that unsets all references to the visual representation of an
@@ -78,7 +80,9 @@ class Hero(Creature):
             elif self.facing[0] == Direction.WEST:
                 angle = 180.0
         gl.glPushMatrix()
-        gl.glTranslatef(float(self.x + self.w / 2), float(self.y + self.h / 2), 0.0)
+        # Follow the sprite, it may be drawn between two steps
+        x, y = self.sprite.x, self.sprite.y - 2
+        gl.glTranslatef(float(x + self.w / 2), float(y + self.h / 2), 0.0)
         gl.glRotatef(angle, 0.0, 0.0, 1.0)
         self.arrow.draw(pyglet.gl.GL_LINE_STRIP)
         gl.glPopMatrix()
@@ -89,7 +93,7 @@ class Hero(Creature):
         x2 = x1 - self.w / 2
         y1 = self.h / 2
         y2 = - (self.h / 2)
-        return pyglet.graphics.vertex_list(
+        return backend.vertex_list(
             3, ('v2i', (x2,    y2,
                         x1,    0,
                         x2,    y1)),
@@ -101,7 +105,8 @@ class Hero(Creature):
         try:
             super(Hero, self).update()
         except CreatureDeath:
-            raise GameOver(True)
+            emit(GameOver(True))
+            return
         if self.animation is not None:
             try:
                 self.animation.update()
@@ -15,46 +15,74 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import itertools, fog, math
-from random import randint
-from exception import (
+import itertools, fog, math, backend, store, events, profiler, tracing
+import allocations
+from collections import defaultdict
+from events import (
     ReplaceObject,
-    CreatureDeath,
     CreateObject,
     AppendMessage,
     AddPathway,
-    EventList,
-    RemovePathway
+    RemovePathway,
+    HeroMoved,
+    CreatureDied
 )
 from util import Container, ObjectMessage
 from obj import Object
+from creature import Creature
+from spatial import SpatialHash
+from walkability import WalkMap
+from navigation import SectorGraph
+from triggers import TriggerEngine
+from placement import FreeSpace, sample
 from decorations import autoset
-from constants import DEBUG
-from function import movements
+from constants import DEBUG, ACTIVE_SECTOR_DEPTH, CREATURE_STORE_MIN
+from rect import Rect
 
 class Level(Container):
     """A game level, stage etc"""
+    # Phases of a tick in the order they run
+    PHASES = ('release_hitboxes', 'settle', 'update_objects',
+              'update_creatures', 'update_visibility', 'update_hitboxes',
+              'hero_interact', 'update_triggers', 'dispatch_events',
+              'update_messages')
     @autoset
     def __init__(self, hero, objects, rooms, pathways,
                  creatures, triggers):
+        self.fog = fog.Fog()
+        self.grid = SpatialHash()
+        # Placeable objects by id
+        self.ids = defaultdict(list)
+        self.reach = 0
+        self.probe = Rect.from_dimensions(0, 0, 0, 0)
         self.objects = Object.from_list(objects)
         self.creatures = Object.from_list(creatures)
         self.hitboxes = []
+        # Objects that took a step during the last tick
+        self.stepped = []
         self.contents = []
-        self.contents.append(self.rooms)
-        self.contents.append(self.pathways)
         self.contents.append(self.objects)
         self.contents.append(self.hitboxes)
         self.contents.append(self.creatures)
         self.creatures.append(self.hero)
         self.set_visual()
+        for obj in self.placeable_objects():
+            self.index_object(obj)
         self.arrange_objects()
         self.init_rooms()
         self.set_enemies()
+        self.sectors = SectorGraph(self.get_containing_places())
+        for c in self.creatures:
+            c.sector = self.sectors.locate(c.rect)
+        self.update_activity()
+        self.creature_store = None
+        others = [c for c in self.creatures if c is not self.hero]
+        if store.numpy is not None and len(others) >= CREATURE_STORE_MIN:
+            self.creature_store = store.CreatureStore(others, self.hero)
         self.set_triggers()
         self.update_fog()
         self.messages = []
-        self.hero_saw = []
+        self.hero_saw = set()
         super(Level, self).__init__(self.contents)
     def init_rooms(self):
         for r in self.rooms:
@@ -64,13 +92,13 @@ class Level(Container):
                 objs = Object.from_list(l)
                 for o in objs:
                     container.append(o)
-                    o.set_visual()
-                    self.set_location(o, r)
+                    o.set_visual(self.sprite_batch)
+                    self.index_object(o)
+                self.place_objects(objs, r)
             set_attributes(r.creatures, self.creatures)
             set_attributes(r.objects, self.objects)
     def init_start_room(self, r):
-        stairs = filter(lambda o: o.id == -2, self.objects)
-        stairs = stairs[0]
+        stairs = self.with_id(-2)[0]
         x = stairs.x
         y = stairs.y
         self.hero.set_location(x, y)
@@ -78,209 +106,461 @@ class Level(Container):
         for i in self.creatures:
             if getattr(i, 'hostile', False):
                 i.target = self.hero
+                i.router = self.route
     def set_triggers(self):
-        def obj_from_id(oid):
-            compare_ids = lambda obj: obj.id == oid
-            return filter(compare_ids, self.placeable_objects())
         for t in self.triggers:
             pred_objs = []
             trigger_objs = []
             for oid in t.predicate.object_ids:
-                pred_objs.extend(obj_from_id(oid))
+                pred_objs.extend(self.with_id(oid))
             for oid in t.object_ids:
-                trigger_objs.extend(obj_from_id(oid))
+                trigger_objs.extend(self.with_id(oid))
             t.set_objects(pred_objs, trigger_objs)
+        self.trigger_engine = TriggerEngine(self.triggers)
+    def index_object(self, obj):
+        """Track an object in the spatial index"""
+        obj.grid = self.grid
+        self.grid.move(obj)
+        self.reach = max(self.reach, obj.range + max(obj.w, obj.h))
+        if obj.id is not None:
+            self.ids[obj.id].append(obj)
+    def unindex_object(self, obj):
+        self.grid.remove(obj)
+        obj.grid = None
+        same = self.ids.get(obj.id)
+        if same is not None and obj in same:
+            same.remove(obj)
+            if not same:
+                del self.ids[obj.id]
+    def with_id(self, oid):
+        """Placeable objects with the given id"""
+        return self.ids.get(oid, [])
     def remove_object(self, obj):
         self.objects.remove(obj)
+        self.unindex_object(obj)
         obj.unset_visual()
     def add_object(self, obj, x = None, y = None):
         """Add and place an object"""
         if x is None:
             obj = obj()
-            obj.set_visual()
+            obj.set_visual(self.sprite_batch)
         else:
-            obj.set_visual()
+            obj.set_visual(self.sprite_batch)
             obj.set_location(x, y)
+        self.index_object(obj)
         self.objects.append(obj)
-    def replace_object(self, ex):
-        """Use a replace exception to replace an object, if the object
+    def replace_object(self, ev):
+        """Use a replace event to replace an object, if the object
 does not exist. Fail silently"""
-        this = filter(lambda o: o.id == ex.this, self.objects)
+        this = [o for o in self.with_id(ev.this)
+                if not isinstance(o, Creature)]
         if len(this) > 0:
             this = this[0]
         else:
             return
-        self.add_object(ex.that(), this.x, this.y)
+        self.add_object(ev.that(), this.x, this.y)
         self.remove_object(this)
     def update(self):
-        del self.hitboxes[:]
+        if profiler.enabled or tracing.enabled or allocations.enabled:
+            self.instrumented_update()
+        else:
+            for name in self.PHASES:
+                getattr(self, name)()
+    def instrumented_update(self):
+        """Update timing the phases for the profilers and the trace"""
+        for name in self.PHASES:
+            tracing.begin(name, 'level')
+            if profiler.enabled:
+                profiler.measure(name, getattr(self, name))
+            else:
+                getattr(self, name)()
+            tracing.end(name, 'level')
+        if profiler.enabled:
+            profiler.end_tick(self.PHASES, self.stats())
+        if allocations.enabled:
+            allocations.end_tick()
+    def stats(self):
+        """Entity counts for the profiler"""
+        return [('objects', len(self.objects)),
+                ('creatures', len(self.creatures)),
+                ('active', sum(1 for c in self.creatures if not c.dormant)),
+                ('hitboxes', len(self.hitboxes)),
+                ('triggers', len(self.trigger_engine))]
+    def update_objects(self):
         for obj in self.objects:
             obj.update()
-        self.update_creatures()
-        self.update_hitboxes()
-        self.hero_interact()
-        self.update_triggers()
-        self.update_messages()
+    def settle(self):
+        """End the steps of the last tick, the objects are drawn where they
+arrived until they step again"""
+        for o in self.stepped:
+            o.prev_x, o.prev_y = o.x, o.y
+            o.moved = True
+        del self.stepped[:]
     def update_fog(self):
-        fog.update(self.hero.x, self.hero.y, self.hero.light_radius)
-    def handle_events(self, fun):
-        try:
-            fun()
-        except ReplaceObject as ex:
-            self.replace_object(ex)
-        except CreateObject as ex:
-            self.add_object(ex.obj)
-        except AppendMessage as ex:
-            self.messages.append(ex.message)
-        except AddPathway as ex:
-            ex.pathway.set_visual()
-            self.pathways.append(ex.pathway)
-        except RemovePathway as ex:
-            self.pathways.remove(ex.pathway)
-        except EventList as ev:
-            def raise_ev(ev):
-                def f():
-                    raise ev
-                return f
-            for i in ev.events:
-                self.handle_events(raise_ev(i))
+        hero = self.hero
+        if profiler.enabled:
+            profiler.measure('fog', self.fog.update, hero.x, hero.y,
+                             hero.light_radius)
+        else:
+            self.fog.update(hero.x, hero.y, hero.light_radius)
+    def dispatch_events(self):
+        """Handle the events emitted during the tick, the others are left for
+the game state"""
+        events.dispatch({
+            ReplaceObject: self.replace_object,
+            CreateObject: lambda ev: self.add_object(ev.obj),
+            AppendMessage: lambda ev: self.messages.append(ev.message),
+            AddPathway: self.add_pathway,
+            RemovePathway: self.remove_pathway,
+            HeroMoved: self.trigger_engine.notify,
+            CreatureDied: self.trigger_engine.notify})
+    def add_pathway(self, ev):
+        ev.pathway.set_visual(self.static_batch)
+        self.pathways.append(ev.pathway)
+        self.walkmap.update(ev.pathway.inner_rect,
+                            self.get_containing_places())
+        self.fog.set_occluders(self.get_containing_places())
+        self.update_fog()
+        self.sectors.add(ev.pathway)
+        self.update_sectors()
+    def remove_pathway(self, ev):
+        ev.pathway.unset_visual()
+        self.pathways.remove(ev.pathway)
+        self.walkmap.update(ev.pathway.inner_rect,
+                            self.get_containing_places())
+        self.fog.set_occluders(self.get_containing_places())
+        self.update_fog()
+        self.sectors.remove(ev.pathway)
+        self.update_sectors()
     def update_triggers(self):
-        for t in self.triggers:
-            self.handle_events(t.update)
+        """Poll the triggers, the others wait for the events dispatched next"""
+        self.trigger_engine.update()
     def update_creatures(self):
-        for c in self.creatures[:]:
-            try:
-                c.update()
+        hero = self.hero
+        self.update_creature(hero)
+        self.update_activity()
+        self.remove_dead()
+        self.measure_proximity()
+        if self.creature_store is None:
+            for c in self.creatures[:]:
+                if c is not hero and not c.dormant:
+                    if c.target is hero:
+                        c.target_distance = self.proximity[c]
+                    else:
+                        c.target_distance = None
+                    self.update_creature(c)
+        else:
+            self.creature_store.update(self.route)
+            for c in self.creature_store.active_creatures():
                 self.update_position(c)
                 self.add_hitbox(c)
-            except CreatureDeath:
-                self.creatures.remove(c)
+    def update_creature(self, creature):
+        creature.update()
+        self.update_position(creature)
+        self.add_hitbox(creature)
+    def locate(self, creature):
+        """Keep track of the sector a creature is in. Creatures that wander
+out of the active sectors go dormant"""
+        sector = self.sectors.locate(creature.rect, creature.sector)
+        if sector is not creature.sector:
+            creature.sector = sector
+            if creature is not self.hero and self.active is not None:
+                self.set_dormant(creature, self.far(sector))
+    def far(self, sector):
+        return sector is not None and sector not in self.active
+    def set_dormant(self, creature, dormant):
+        """Dormant creatures are skipped by the update. A creature waking up
+forgets where it wanted to go and the distances it measured"""
+        if creature.dormant == dormant:
+            return
+        creature.dormant = dormant
+        if not dormant:
+            creature.intent(creature.x, creature.y)
+            creature.target_distance = None
+    def update_activity(self):
+        """Wake the creatures at most ACTIVE_SECTOR_DEPTH sectors away from
+the hero and put the others to sleep, when the hero changes sector"""
+        hero = self.hero
+        self.locate(hero)
+        if self.active is not None and hero.sector is self.active_origin:
+            return
+        self.active_origin = hero.sector
+        if hero.sector is None:
+            self.active = set(self.sectors.places)
+        else:
+            self.active = set(self.sectors.within(hero.sector,
+                                                  ACTIVE_SECTOR_DEPTH))
+        for c in self.creatures:
+            if c is not hero:
+                self.set_dormant(c, self.far(c.sector))
+    def update_sectors(self):
+        """Locate again the creatures and the active sectors after a sector
+was added or removed"""
+        for c in self.creatures:
+            c.sector = self.sectors.locate(c.rect, c.sector)
+        self.active = None
+        self.update_activity()
+    def route(self, creature):
+        """Where a creature chasing the hero heads for: the door to the next
+sector on its way to the hero, None to go straight at the hero"""
+        goal = self.hero.sector
+        if creature.sector is goal or creature.sector is None or goal is None:
+            return None
+        w, h = creature.w, creature.h
+        door = self.sectors.waypoint(creature.sector, goal,
+                                     creature.x + w / 2, creature.y + h / 2)
+        if door is None:
+            return None
+        return door[0] - w / 2, door[1] - h / 2
+    def remove_dead(self):
+        if self.creature_store is None:
+            dead = [c for c in self.creatures
+                    if not c.dormant and c.dead() and c is not self.hero]
+        else:
+            dead = self.creature_store.remove_dead()
+        for c in dead:
+            self.remove_creature(c)
+    def remove_creature(self, creature):
+        self.creatures.remove(creature)
+        self.unindex_object(creature)
+        creature.unset_visual()
+    def measure_proximity(self):
+        """Measure once per tick the distance from the center of every object
+to the center of the hero, it is shared by the creatures chasing the hero,
+visibility, interaction and messages"""
+        hero = self.hero
+        cx = hero.x + hero.w / 2
+        cy = hero.y + hero.h / 2
+        store = self.creature_store
+        if store is None:
+            proximity = {}
+            others = itertools.chain(
+                self.objects, (c for c in self.creatures if not c.dormant))
+        else:
+            store.measure(cx, cy)
+            proximity = store.active_distances()
+            others = self.objects
+        for o in others:
+            proximity[o] = math.hypot(o.x + o.w / 2 - cx, o.y + o.h / 2 - cy)
+        proximity.pop(hero, None)
+        self.proximity = proximity
+    def update_visibility(self):
+        """Show the creatures within the light radius of the hero"""
+        radius = self.hero.light_radius
+        store = self.creature_store
+        if store is None:
+            for c in self.creatures:
+                if c is not self.hero and not c.dormant:
+                    visible = self.proximity[c] <= radius or DEBUG
+                    if c.visible_ != visible:
+                        c.visible_ = visible
+        elif not DEBUG:
+            store.update_visibility(radius)
     def update_messages(self):
+        hero = self.hero
+        reach = hero.range + max(hero.h, hero.w) / 2
+        proximity = self.proximity
         for o in self.placeable_objects():
-            if (o not in self.hero_saw
-                and self.hero.within_range(o)
-                and o != self.hero):
-                self.hero_saw.append(o)
+            d = proximity.get(o)
+            if (d is not None and d <= reach and o not in self.hero_saw
+                and o.grid is not None):
+                self.hero_saw.add(o)
                 self.messages.append(
                     ObjectMessage('You see a {0}({1})', o))
     def add_hitbox(self, creature):
         if creature.hitbox is not None:
             self.hitboxes.append(creature.hitbox)
             creature.hitbox = None
+    def release_hitboxes(self):
+        for b in self.hitboxes:
+            b.release()
+        del self.hitboxes[:]
     def update_hitboxes(self):
         for b in self.hitboxes:
             self.hitbox_eval(b)
     def hitbox_eval(self, b):
-        for c in self.creatures:
-            if b.hit(c):
+        for c in self.grid.query(b.rect):
+            if isinstance(c, Creature) and b.hit(c):
+                alive = not c.dead()
                 c.be_attacked(b)
+                if alive and c.dead():
+                    events.emit(CreatureDied(c))
+    def nearby(self, obj, distance):
+        """Objects whose rect is within distance of the rect of obj"""
+        return self.grid.query(obj.rect.expanded_by(distance))
     def hero_interact(self):
         if self.hero.intended_interact:
-            for o in self.placeable_objects():
-                if o == self.hero:
-                    continue
-                if o.within_range(self.hero):
-                    self.handle_events(o.on_interact)
-                    return
+            proximity = self.proximity
+            close = [o for o in self.nearby(self.hero, self.reach)
+                     if o in proximity
+                     and proximity[o] <= o.range + max(o.h, o.w) / 2]
+            if close:
+                o = min(close, key=proximity.get)
+                o.on_interact()
+    def sweep(self, obj, x, y, distance, horizontal):
+        """Move the rect of obj from (x, y) along one axis and return the
+furthest coordinate, at most distance away, where it stays walkable without
+running into a solid object. Objects already touching obj at the start do
+not block it so that it can always walk away from them"""
+        start = x if horizontal else y
+        if distance == 0:
+            return start
+        w, h = obj.w, obj.h
+        here = Rect.from_dimensions(x, y, w, h)
+        if horizontal:
+            swept = Rect.from_dimensions(min(x, x + distance), y,
+                                         w + abs(distance), h)
+        else:
+            swept = Rect.from_dimensions(x, min(y, y + distance),
+                                         w, h + abs(distance))
+        reach = abs(distance)
+        for o in self.grid.query(swept):
+            if o is obj or o.go_through:
+                continue
+            r = o.rect
+            if not r.overlaps(swept) or r.overlaps(here):
+                continue
+            if horizontal:
+                gap = r.left - here.right if distance > 0 else here.left - r.right
+            else:
+                gap = r.bottom - here.top if distance > 0 else here.bottom - r.top
+            reach = min(reach, gap - 1)
+        step = 1 if distance > 0 else -1
+        probe = self.probe
+        for d in range(reach, 0, -1):
+            c = start + d * step
+            if horizontal:
+                probe.set_points_from_dimensions(c, y, w, h)
+            else:
+                probe.set_points_from_dimensions(x, c, w, h)
+            if self.walkmap.contains(probe):
+                return c
+        return start
     def update_position(self, creature):
-        if not creature.go_through:
-            for i in movements(creature.x, creature.y, creature.intended_x,
-                               creature.intended_y):
-                creature.set_location(*i)
-                if (self.contained_in_any_room(creature)
-                    and not self.collide_with_objects(creature)):
-                    if creature == self.hero:
-                        self.update_fog()
-                    else:
-                        x = creature.x
-                        y = creature.y
-                        x1 = self.hero.x
-                        y1 = self.hero.y
-                        if math.hypot(x1 - x, y1 - y) <= self.hero.light_radius or DEBUG:
-                            creature.visible_ = True
-                        else:
-                            creature.visible_ = False
-                    break
-                else:
-                    pass
+        """Resolve the intended movement of a creature one axis at a time so
+that it slides along walls and obstacles"""
+        if creature.go_through:
+            return
+        x, y = creature.x, creature.y
+        if x == creature.intended_x and y == creature.intended_y:
+            return
+        x0, y0 = x, y
+        x = self.sweep(creature, x, y, creature.intended_x - x, True)
+        y = self.sweep(creature, x, y, creature.intended_y - y, False)
+        creature.set_location(x, y)
+        creature.prev_x, creature.prev_y = x0, y0
+        self.stepped.append(creature)
+        if creature == self.hero:
+            self.update_fog()
+            events.emit(HeroMoved(creature))
+        else:
+            self.locate(creature)
     def placeable_objects(self):
         return itertools.chain(self.objects, self.creatures)
     def arrange_objects(self):
         """Set initial arrangement of the objects"""
-        for obj in self.placeable_objects():
-            if obj.x == 0 and obj.y == 0:
-                self.set_location(obj)
-    def get_random_position_in_room(self, width, height, room):
-        """Returns a random walkable point in a room"""
-        rect = room.inner_rect
-        x = randint(rect.left, rect.right)
-        y = randint(rect.bottom, rect.top)
-        return x, y
-    def get_random_position(self, width, height):
-        """Returns a random walkable point in the map"""
-        lc = list(self.get_containing_places())
-        room = lc[randint(0, len(lc) - 1)]
-        return self.get_random_position_in_room(width, height, room)
+        self.place_objects([obj for obj in self.placeable_objects()
+                            if obj.x_ == 0 and obj.y_ == 0])
     def get_containing_places(self):
         """Returns all rooms an pathways"""
         return itertools.chain(self.rooms, self.pathways)
-    def collide_with_rect(self, obj1, obj2):
-        """Ugly bit of code that requires a previous state to be set"""
-        return obj1.rect.overlaps(obj2.rect)
-    def contained_in_a_room(self, obj, room):
-        """True if the rect defined by the given dimensions is inside the given
-room or pathway"""
-        return room.inner_rect.contains(obj.rect)
-    def contained_in_any_room(self, obj):
-        """True if the rect defined by the given dimensions is inside a room or
-pathway"""
-        return any(self.contained_in_a_room(obj, r)
-                   for r in itertools.chain(self.rooms, self.pathways))
-    def collide_with_objects(self, obj, ignore_go_through = False):
-        """True if the rect defined by the given dimensions collide with any object
-except for ex"""
-        return any(self.collide_with_rect(obj, i) for i in self.placeable_objects()
-                   if i != obj and (ignore_go_through or not i.go_through))
+    def free_space(self, place, w, h, ignore):
+        """Positions inside a room or pathway where a w x h object does not
+touch any object except the ignored ones"""
+        space = FreeSpace(place.inner_rect, w, h)
+        # The query is a set, occupy in a fixed order so that a seed always
+        # gives the same placement
+        obstacles = sorted((o for o in self.grid.query(place.inner_rect)
+                            if o not in ignore),
+                           key=lambda o: (o.x, o.y, o.w, o.h))
+        for o in obstacles:
+            space.occupy(o.rect)
+        return space
+    def place_objects(self, objs, room = None):
+        """Assign random free positions to objects inside room or anywhere in
+the map. Raises an exception if an object does not fit"""
+        places = [room] if room is not None else list(
+            self.get_containing_places())
+        pending = set(objs)
+        spaces = {}
+        for obj in objs:
+            size = (obj.w, obj.h)
+            if size not in spaces:
+                spaces[size] = [self.free_space(p, obj.w, obj.h, pending)
+                                for p in places]
+            position = sample(spaces[size])
+            if position is None:
+                raise Exception('Could not assign a position to object: '
+                                + str(obj))
+            obj.set_location(*position)
+            pending.discard(obj)
+            for s in itertools.chain.from_iterable(spaces.values()):
+                s.occupy(obj.rect)
     def set_location(self, obj, room = None):
-        """Assign a random free position to an object. Will try at most 10000
-times before raising an exception"""
-        width = obj.w
-        height = obj.h
-        for i in range(10000):
-            if room is None:
-                x, y = self.get_random_position(width, height)
-                obj.set_location(x, y)
-                contained = self.contained_in_any_room(obj)
-            else:
-                x, y = self.get_random_position_in_room(width, height, room)
-                obj.set_location(x, y)
-                contained = self.contained_in_a_room(obj, room)
-            if contained and not self.collide_with_objects(obj, True):
-                return
-        raise Exception('Could not assign a position to object: '
-                        + str(obj))
-    def draw(self):
-        for l in self.contents:
-            for i in l:
-                i.draw()
-        if not DEBUG:
-            fog.draw()
+        """Assign a random free position to an object"""
+        self.place_objects([obj], room)
+    @tracing.traced('Level.draw', 'render')
+    def draw(self, alpha = 1.0):
+        """Draw the level alpha of the way from the last tick to the next"""
+        if profiler.enabled:
+            profiler.frame(profiler.measure('draw', self.render, alpha))
+        else:
+            self.render(alpha)
+    def render(self, alpha):
+        """Draw the level and return an estimate of the draw calls it took:
+one per batch and per object drawn on its own, whatever pyglet issues within
+them"""
+        for o in self.placeable_objects():
+            if o.moved:
+                o.update_visual()
+        for o in self.stepped:
+            o.update_visual(alpha)
+        self.static_batch.draw()
+        self.sprite_batch.draw()
+        if DEBUG:
+            for b in self.hitboxes:
+                b.draw()
+            for o in self.placeable_objects():
+                o.draw()
+            return (2 + len(self.hitboxes) + len(self.objects)
+                    + len(self.creatures))
+        else:
+            self.hero.draw()
+            self.fog.draw()
+            return 4
     def unset_visual(self):
         """Method that unsets all references to the visual representation of an
         object"""
-        del self.hitboxes[:]
-        self.fogm = fog.save()
-        fog.reset()
+        self.release_hitboxes()
+        self.fog.suspend()
         self.lastxy = self.hero.x, self.hero.y
+        # Rebuilt from the rooms and pathways by set_visual, it is most of the
+        # level and is left out of the saves and the retained levels
+        del self.walkmap
+        for p in self.get_containing_places():
+            p.unset_visual()
+        del self.static_batch
         for i in self.contents:
             for j in i:
                 j.unset_visual()
+        del self.sprite_batch
     def set_visual(self):
         """Method that sets the visual representation of an object"""
-        if hasattr(self, 'fogm'):
-            fog.load(self.fogm)
+        self.fog.resume()
+        self.fog.set_occluders(self.get_containing_places())
+        self.walkmap = WalkMap(self.get_containing_places())
+        self.static_batch = backend.batch()
+        for p in self.get_containing_places():
+            p.set_visual(self.static_batch)
+        self.sprite_batch = backend.batch()
         for i in self.contents:
             for j in i:
-                j.set_visual()
+                j.set_visual(self.sprite_batch)
+        self.active = None
+        self.hero.sector = None
         lastxy = getattr(self, 'lastxy', (0, 0))
-        (self.hero.x, self.hero.y) = lastxy
+        self.hero.grid = self.grid
+        self.hero.set_location(*lastxy)
+        # The hero appears in the level, region triggers are checked on the
+        # next update wherever it is by then
+        events.emit(HeroMoved(self.hero))
@@ -24,14 +24,17 @@ from util import (
 from obj import Object
 from creature import Creature
 from level import Level
-from function import raise_ev, once
-from exception import (
+from function import emit_ev, once
+from events import (
     ReplaceObject,
     NextLevel,
     EventList,
     AppendMessage,
     AddPathway,
-    RemovePathway
+    RemovePathway,
+    HeroMoved,
+    CreatureDied,
+    emit
 )
 from functools import partial
 from room import Room, MagneticPathway
@@ -61,7 +64,7 @@ DESC_STAIRS = partial(
     True,
     '>',
     'descending stairs',
-    event_map = on_interact_map(raise_ev(NextLevel)),
+    event_map = on_interact_map(emit_ev(NextLevel)),
     id = 2,
     x_=140,
     y_=90
@@ -78,7 +81,7 @@ leverid = 4
 def replace_for_lever(this, that):
     def r(self):
         msg_ev = AppendMessage('You hear a rumbling noise form southeast')
-        raise EventList([ReplaceObject(this, that), msg_ev])
+        emit(EventList(ReplaceObject(this, that), msg_ev))
     return r
 
 BOULDER = partial(
@@ -162,12 +165,12 @@ RUINED_LEVER = partial(
 )
 
 SWORDSMAN_TRIGGER = RunOnceTrigger(
-    raise_ev(AppendMessage, '?????: Hold him!'),
+    emit_ev(AppendMessage, '?????: Hold him!'),
     HeroEnterRegion(350, 190, 100, 10),
     [])
 
 BLOCK_STAIRS_TRIGGER = RunOnceTrigger(
-    raise_ev(ReplaceObject, -2, BOULDER),
+    emit_ev(ReplaceObject, -2, BOULDER),
     HeroEnterRegion(144, 100, 10, 10),
     [])
 
@@ -185,16 +188,16 @@ def scroll_message_pred(objects):
     return any(o.dead() for o in objects)
 
 TUTORIAL3 = RunOnceTrigger(
-    raise_ev(AppendMessage, SCROLL_MESSAGE),
-    Predicate([wolfid], scroll_message_pred),
+    emit_ev(AppendMessage, SCROLL_MESSAGE),
+    Predicate([wolfid], scroll_message_pred, (CreatureDied,)),
     [])
 
 def interact_message_pred(objects):
     return objects[0].visible(objects[1])
 
 TUTORIAL4 = RunOnceTrigger(
-    raise_ev(AppendMessage, INTERACT_MESSAGE),
-    Predicate([HERO_ID, leverid], interact_message_pred),
+    emit_ev(AppendMessage, INTERACT_MESSAGE),
+    Predicate([HERO_ID, leverid], interact_message_pred, (HeroMoved,)),
     [])
 
 room1 = Room(50, 50, 100, 100,
@@ -216,7 +219,7 @@ p2 = MagneticPathway(room2, room3)
 p3 = MagneticPathway(room2, room4)
 
 REMOVE_PATHWAY_TRIGGER = RunOnceTrigger(
-    raise_ev(
+    emit_ev(
         EventList,
         AppendMessage('Holy swordsman: Seal the exit!'),
         RemovePathway(p3)
@@ -226,7 +229,7 @@ REMOVE_PATHWAY_TRIGGER = RunOnceTrigger(
 
 PATHWAY_LEVER = partial(
     LEVER_BASE,
-    event_map = on_interact_map(once(raise_ev(
+    event_map = on_interact_map(once(emit_ev(
         EventList,
         AddPathway(p3),
         AppendMessage('A secret door opens')
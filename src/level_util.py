@@ -15,15 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-from exception import AppendMessage, PreviousLevel
+from events import AppendMessage, PreviousLevel
 from functools import partial
-from function import raise_ev
+from function import emit_ev
 from obj import Object
 
 def on_interact_map(fun):
     return {'on_interact': fun}
 
-append_message = partial(raise_ev, AppendMessage)
+append_message = partial(emit_ev, AppendMessage)
 
 def on_interact_append_message(message):
     return on_interact_map(append_message(message))
@@ -33,6 +33,6 @@ ASC_STAIRS = partial(
     True,
     '<',
     'ascending stairs',
-    event_map = on_interact_map(raise_ev(PreviousLevel)),
+    event_map = on_interact_map(emit_ev(PreviousLevel)),
     id = -2,
 )
@@ -51,7 +51,7 @@ buff = ""
 m = __import__('level1' + buff)
 ui_state = None
 prop = Object(False, 'T', 'Prop')
-state.level.objects.append(prop)
+state.level.add_object(prop, 0, 0)
 status = pyglet.text.Label("", color=Color.WHITE, x=20, y=20)
 input_label = pyglet.text.Label("", color=Color.WHITE, x=350, y=20)
 
@@ -91,7 +91,7 @@ def reload_stage():
         traceback.print_exc()
         return
     state.level = m.LEVEL(hero)
-    state.level.objects.append(prop)
+    state.level.add_object(prop, 0, 0)
 
 @window.event
 def on_key_release(symbol, modifiers):
@@ -140,12 +140,12 @@ def on_mouse_release(x, y, button, modifiers):
     if xy0 != (x, y) and ui_state == NEW_ROOM:
         dxy = delta_xy(x, y)
         room = Room(dxy[0], dxy[1], dxy[2], dxy[3])
+        room.set_visual(state.level.static_batch)
         state.level.rooms.append(room)
         vl.colors[:] = BACKGROUND_COLOR * 6
         print('Room{0}'.format(str(dxy)))
     elif ui_state == MOVE_PROP:
-        prop.x = x
-        prop.y = y
+        prop.set_location(x, y)
         print (x, y)
 
 @window.event
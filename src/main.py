@@ -18,7 +18,7 @@
 
 import pyglet
 from control import state
-from constants import (WINDOW_WIDTH, WINDOW_HEIGHT, GAME_NAME, INTERVAL,
+from constants import (WINDOW_WIDTH, WINDOW_HEIGHT, GAME_NAME,
                        BACKGROUND_COLOR)
 from util import SubscriptionFound
 from pyglet.window import key
@@ -48,7 +48,7 @@ def init():
     keys = key.KeyStateHandler()
     window.push_handlers(keys)
     state.khandler = keys
-    pyglet.clock.schedule_interval(state.update, INTERVAL)
+    pyglet.clock.schedule(state.update)
     pyglet.app.run()
 
 if __name__ == '__main__':
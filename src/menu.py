@@ -16,7 +16,7 @@
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
 """List of game menus"""
-import pyglet
+import backend
 from util import KeySubscription, Drawable, Reactable
 from screens import Screen, MenuScreen
 from decorations import autoset
@@ -51,23 +51,23 @@ def quit_game():
     raise QuitGame()
 
 CHOOSE_DIFICULTY = MenuScreen([
-    pyglet.text.Label('Choose the game dificulty',
-                          font_name=TEXT_FONT,
-                          font_size=25,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
-                          anchor_x='center', anchor_y='center'),
+    backend.label('Choose the game dificulty',
+                  font_name=TEXT_FONT,
+                  font_size=25,
+                  x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
+                  anchor_x='center', anchor_y='center'),
     Option([KeySubscription(start_game(NORMAL_DIFICULTY), key.N)],
            'Normal',
-           pyglet.text.Label(font_name=TEXT_FONT,
-                          font_size=TEXT_SIZE,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 52,
-                          anchor_x='center', anchor_y='center')),
+           backend.label(font_name=TEXT_FONT,
+                         font_size=TEXT_SIZE,
+                         x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 52,
+                         anchor_x='center', anchor_y='center')),
     Option([KeySubscription(start_game(not NORMAL_DIFICULTY), key.H)],
            'Hard',
-           pyglet.text.Label(font_name=TEXT_FONT,
-                          font_size=TEXT_SIZE,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 72,
-                          anchor_x='center', anchor_y='center'))
+           backend.label(font_name=TEXT_FONT,
+                         font_size=TEXT_SIZE,
+                         x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 72,
+                         anchor_x='center', anchor_y='center'))
 ])
 
 QUIT_SUBSCRIPTIONS = [
@@ -77,37 +77,37 @@ QUIT_SUBSCRIPTIONS = [
 ]
 
 MAIN_MENU = MenuScreen([
-    pyglet.text.Label(GAME_NAME,
-                          font_name=TEXT_FONT,
-                          font_size=36,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
-                          anchor_x='center', anchor_y='center'),
+    backend.label(GAME_NAME,
+                  font_name=TEXT_FONT,
+                  font_size=36,
+                  x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
+                  anchor_x='center', anchor_y='center'),
     Option([KeySubscription(start_game(NORMAL_DIFICULTY), Controls.ACCEPT)],
            'New game',
-           pyglet.text.Label(font_name=TEXT_FONT,
-                             font_size=TEXT_SIZE,
-                             x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 72,
-                             anchor_x='center', anchor_y='center')),
+           backend.label(font_name=TEXT_FONT,
+                         font_size=TEXT_SIZE,
+                         x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 72,
+                         anchor_x='center', anchor_y='center')),
     Option(QUIT_SUBSCRIPTIONS[0:1],
            'Quit',
-           pyglet.text.Label(font_name=TEXT_FONT,
-                             font_size=TEXT_SIZE,
-                             x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 92,
-                             anchor_x='center', anchor_y='center'))
+           backend.label(font_name=TEXT_FONT,
+                         font_size=TEXT_SIZE,
+                         x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2 - 92,
+                         anchor_x='center', anchor_y='center'))
 ])
 
 VICTORY_SCREEN = Screen([
-    pyglet.text.Label(VICTORY,
-                          font_name=TEXT_FONT,
-                          font_size=36,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
-                          anchor_x='center', anchor_y='center')
+    backend.label(VICTORY,
+                  font_name=TEXT_FONT,
+                  font_size=36,
+                  x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
+                  anchor_x='center', anchor_y='center')
 ])
 
 DEFEAT_SCREEN = Screen([
-    pyglet.text.Label(GAME_OVER,
-                          font_name=TEXT_FONT,
-                          font_size=36,
-                          x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
-                          anchor_x='center', anchor_y='center')
+    backend.label(GAME_OVER,
+                  font_name=TEXT_FONT,
+                  font_size=36,
+                  x=WINDOW_WIDTH//2, y=WINDOW_HEIGHT//2,
+                  anchor_x='center', anchor_y='center')
 ])
@@ -0,0 +1,128 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Rooms and pathways of a level seen as a graph of sectors"""
+
+from collections import deque
+from rect import Rect
+
+def overlap(a, b):
+    """Rect shared by two overlapping rects"""
+    left = max(a.left, b.left)
+    bottom = max(a.bottom, b.bottom)
+    return Rect.from_dimensions(left, bottom, min(a.right, b.right) - left,
+                                min(a.top, b.top) - bottom)
+
+class SectorGraph(object):
+    """Rooms and pathways linked when their walkable areas overlap, the
+overlap is the door between them"""
+    def __init__(self, places):
+        self.build(places)
+    def build(self, places):
+        self.places = []
+        self.links = {}
+        self.doors = {}
+        self.flows = {}
+        for p in places:
+            self.add(p)
+    def add(self, place):
+        self.links[place] = []
+        for p in self.places:
+            if p.inner_rect.overlaps(place.inner_rect):
+                door = overlap(p.inner_rect, place.inner_rect)
+                self.links[p].append(place)
+                self.links[place].append(p)
+                self.doors[p, place] = self.doors[place, p] = door
+        self.places.append(place)
+        self.invalidate(place, self.links[place])
+    def remove(self, place):
+        neighbours = self.links.pop(place)
+        for p in neighbours:
+            self.links[p].remove(place)
+            del self.doors[p, place]
+            del self.doors[place, p]
+        self.places.remove(place)
+        self.invalidate(place, neighbours)
+    def invalidate(self, place, neighbours):
+        """Drop the flows that place, linked to neighbours, was added to or
+removed from. The others never reached it and stay valid"""
+        for goal, flow in list(self.flows.items()):
+            if goal is place or place in flow or any(
+                    p is goal or p in flow for p in neighbours):
+                del self.flows[goal]
+    def locate(self, rect, hint = None):
+        """Sector holding the center of rect. hint is where it was last seen,
+it and its neighbours are looked at first"""
+        x = (rect.left + rect.right) / 2
+        y = (rect.bottom + rect.top) / 2
+        if hint in self.links:
+            if hint.inner_rect.contains_point(x, y):
+                return hint
+            candidates = self.links[hint]
+        else:
+            candidates = ()
+        for p in candidates:
+            if p.inner_rect.contains_point(x, y):
+                return p
+        for p in self.places:
+            if p.inner_rect.contains_point(x, y):
+                return p
+        return None
+    def within(self, start, depth):
+        """Sectors at most depth links away from start and their distance"""
+        found = {start: 0}
+        pending = deque([start])
+        while pending:
+            p = pending.popleft()
+            d = found[p] + 1
+            if d > depth:
+                continue
+            for q in self.links[p]:
+                if q not in found:
+                    found[q] = d
+                    pending.append(q)
+        return found
+    def flow(self, goal):
+        """Flow field towards goal: the next sector and the door to it for
+every sector that can reach goal. It is shared by everything heading to goal
+and kept until a sector linked to it is added or removed"""
+        flow = self.flows.get(goal)
+        if flow is None:
+            flow = self.flows[goal] = {}
+            pending = deque([goal])
+            while pending:
+                p = pending.popleft()
+                for q in self.links[p]:
+                    if q is not goal and q not in flow:
+                        flow[q] = (p, self.doors[q, p])
+                        pending.append(q)
+        return flow
+    def waypoint(self, sector, goal, x, y):
+        """Center of the next door to go through from x, y in sector to reach
+goal. None when already in goal or goal can not be reached"""
+        if goal not in self.links:
+            return None
+        flow = self.flow(goal)
+        while sector is not goal:
+            step = flow.get(sector)
+            if step is None:
+                return None
+            sector, door = step
+            if not door.contains_point(x, y):
+                return ((door.left + door.right) / 2,
+                        (door.bottom + door.top) / 2)
+        return None
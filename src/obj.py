@@ -15,14 +15,10 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import pyglet, types
+import pyglet, types, math, glyphs
 from util import Drawable
-from rect import Point, Rect
-from constants import (
-    OBJECT_FONT_SIZE,
-    OBJECT_FONT_FACE,
-    DEBUG,
-    TEXT_COLOR)
+from rect import Rect
+from constants import DEBUG, TEXT_COLOR
 from decorations import autoset
 from function import vertex_list_from_rect
 
@@ -31,8 +27,13 @@ def empty_interaction(self):
 
 class Object(Drawable):
     """An object in game"""
-    pa = Point(0, 0)
-    pb = Point(0, 0)
+    # Position and size are plain fields, rect is kept in step with them by
+    # set_location. The __dict__ slot is left for attributes set by scripts
+    __slots__ = ('go_through', 'symbol', 'description', 'event_map', 'range',
+                 'id', 'x_', 'y_', 'color', 'delayed', 'on_interact', 'sprite',
+                 'grid', 'x', 'y', 'w', 'h', 'rect', 'moved', 'prev_x',
+                 'prev_y', '__dict__')
+    group = glyphs.OBJECT_GROUP
     @classmethod
     def from_list(cls, l):
         def fun():
@@ -47,23 +48,37 @@ class Object(Drawable):
     def __init__(self, go_through, symbol, description,
                  event_map = {}, range = 1, id = None, x_ = 0,
                  y_ = 0, color = TEXT_COLOR, delayed = empty_interaction):
+        self.grid = None
+        self.w, self.h = glyphs.size(symbol)
+        self.h -= 3
+        self.x = x_
+        self.y = y_ - 2
+        self.prev_x, self.prev_y = self.x, self.y
+        self.rect = Rect.from_dimensions(self.x, self.y, self.w, self.h)
+        self.moved = False
         delayed(self)
         self.set_events(self.event_map)
-        self.rect_ = Rect.from_dimensions(0, 0, 0, 0)
     def unset_visual(self):
         """Method that unsets all references to the visual representation of an
         object"""
+        self.sprite.delete()
         del self.sprite
-    def set_visual(self):
-        """Method that sets the visual representation of an object"""
-        sprite = pyglet.text.Label(
-            text=self.symbol,
-            font_name=OBJECT_FONT_FACE,
-            font_size=OBJECT_FONT_SIZE,
-            color=self.color,
-            x=self.x_,
-            y=self.y_)
+    def set_visual(self, batch):
+        """Method that sets the visual representation of an object as a sprite
+of batch"""
+        sprite = glyphs.Symbol(self.symbol, self.color, self.x, self.y + 2,
+                               batch, self.group)
         super(Object, self).__init__(sprite)
+        self.moved = False
+    def update_visual(self, alpha = 1.0):
+        """Move the sprite to where the object is, or alpha of the way there
+from where it was before its last step"""
+        x, y = self.x, self.y
+        if alpha < 1.0:
+            x = int(round(self.prev_x + (x - self.prev_x) * alpha))
+            y = int(round(self.prev_y + (y - self.prev_y) * alpha))
+        self.sprite.set_position(x, y + 2)
+        self.moved = False
     def get_default_map(self):
         return {'on_interact': empty_interaction}
     def set_events(self, event_map):
@@ -71,73 +86,29 @@ class Object(Drawable):
         nm.update(event_map)
         for k in nm:
              self.__setattr__(k, types.MethodType(nm[k], self))
-    @property
-    def x(self):
-        return self.sprite.x
-    @x.setter
-    def x(self, value):
-        self.x_ = value
-        self.sprite.x = value
-    @x.deleter
-    def x(self):
-        del self.sprite.x
-    @property
-    def y(self):
-        return self.sprite.y - 2
-    @y.setter
-    def y(self, value):
-        self.y_ = value + 2
-        self.sprite.y = value + 2
-    @y.deleter
-    def y(self):
-        del self.sprite.y
-    @property
-    def w(self):
-        return self.sprite.content_width
-    @w.setter
-    def w(self, value):
-        self.sprite.content_width = value
-    @w.deleter
-    def w(self):
-        del self.sprite.content_width
-    @property
-    def h(self):
-        return self.sprite.content_height - 3
-    @h.setter
-    def h(self, value):
-        self.sprite.content_height = value
-    @h.deleter
-    def h(self):
-        del self.sprite.content_height
-    @property
-    def rect(self):
-        self.rect_.set_points_from_dimensions(
-            self.x,
-            self.y,
-            self.w,
-            self.h)
-        return self.rect_
     def set_location(self, x, y):
-        self.x = x
-        self.y = y
+        """Put the object at x, y at once, without a step to interpolate"""
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.rect.set_points_from_dimensions(x, y, self.w, self.h)
+        self.moved = True
+        if self.grid is not None:
+            self.grid.move(self)
     def update(self):
         pass
     def within_distance(self, obj, distance):
         """If obj is at most distance from self return true"""
-        Object.pa.x = self.x + self.w / 2
-        Object.pa.y = self.y + self.h / 2
-        Object.pb.x = obj.x + obj.w / 2
-        Object.pb.y = obj.y + obj.h / 2
-        return (Object.pa.distance_to(Object.pb) <= distance
-                +  max(self.h, self.w) / 2)
+        return (math.hypot(obj.x + obj.w / 2 - self.x - self.w / 2,
+                           obj.y + obj.h / 2 - self.y - self.h / 2)
+                <= distance + max(self.h, self.w) / 2)
     def within_range(self, obj):
         return self.within_distance(obj, self.range)
     def draw(self):
+        """Draw what is not part of the level batch"""
         if DEBUG:
             x, y = self.x, self.y
             w, h = self.w, self.h
             rect = vertex_list_from_rect(x, y, w, h)
             rect.draw(pyglet.gl.GL_QUAD_STRIP)
-        super(Object, self).draw()
     def __str__(self):
         return self.description + '({0})'.format(self.symbol)
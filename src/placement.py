@@ -0,0 +1,80 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Free space bookkeeping used to place objects"""
+
+import random
+
+class FreeSpace(object):
+    """Positions at which an object of size w x h fits inside an area without
+touching anything, kept as a list of disjoint inclusive rectangles of
+(left, bottom, right, top)"""
+    def __init__(self, area, w, h):
+        self.w = w
+        self.h = h
+        l, b = area.left, area.bottom
+        r, t = area.right - w, area.top - h
+        if l <= r and b <= t:
+            self.rects = [(l, b, r, t)]
+        else:
+            self.rects = []
+    def occupy(self, rect):
+        """Remove the positions at which the object would overlap rect"""
+        fl = rect.left - self.w
+        fb = rect.bottom - self.h
+        fr = rect.right
+        ft = rect.top
+        rects = []
+        for l, b, r, t in self.rects:
+            if fl > r or fr < l or fb > t or ft < b:
+                rects.append((l, b, r, t))
+                continue
+            if l < fl:
+                rects.append((l, b, fl - 1, t))
+            if fr < r:
+                rects.append((fr + 1, b, r, t))
+            il = max(l, fl)
+            ir = min(r, fr)
+            if b < fb:
+                rects.append((il, b, ir, fb - 1))
+            if ft < t:
+                rects.append((il, ft + 1, ir, t))
+        self.rects = rects
+    def area(self):
+        """Number of free positions"""
+        return sum((r - l + 1) * (t - b + 1) for l, b, r, t in self.rects)
+    def pick(self, n):
+        """Return the nth free position"""
+        for l, b, r, t in self.rects:
+            width = r - l + 1
+            size = width * (t - b + 1)
+            if n < size:
+                return l + n % width, b + n // width
+            n -= size
+
+def sample(spaces):
+    """Return a uniformly chosen free position among many free spaces or None
+if all of them are full"""
+    areas = [s.area() for s in spaces]
+    total = sum(areas)
+    if total == 0:
+        return None
+    n = random.randrange(total)
+    for s, a in zip(spaces, areas):
+        if n < a:
+            return s.pick(n)
+        n -= a
@@ -0,0 +1,142 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Timings of the phases of the game loop.
+
+While enabled the level times each phase of its update and its drawing, the
+last PROFILE_WINDOW ticks are summarized by the overlay of the game screen
+and every tick is appended as a row to PROFILE_FILE, where the sessions
+follow each other with n starting over at 0. Disabled, the level only checks
+the enabled flag once per tick."""
+
+import csv, os, timeit
+from collections import OrderedDict, deque
+from constants import INTERVAL, PROFILE_WINDOW, PROFILE_FILE
+
+timer = timeit.default_timer
+# Timed apart from the phases of the update: the fog is updated within the
+# creatures phase and the level is drawn between ticks
+EXTRA = ('fog', 'draw')
+enabled = False
+# Seconds spent in each phase during the current tick
+current = OrderedDict()
+# Seconds spent in each phase during the last PROFILE_WINDOW ticks
+history = OrderedDict()
+# If the header of the log is still to be written
+header = False
+# Counts of the last tick: entities, frames and the estimated draw calls per
+# frame
+counts = OrderedDict()
+frames = 0
+draw_calls = 0
+tick = 0
+log = None
+writer = None
+columns = None
+
+def enable(path = PROFILE_FILE):
+    global enabled, log, writer, columns, tick, header
+    enabled = True
+    header = not os.path.exists(path) or os.path.getsize(path) == 0
+    log = open(path, 'a')
+    writer = csv.writer(log)
+    columns = None
+    tick = 0
+    reset()
+
+def disable():
+    global enabled, log, writer
+    enabled = False
+    if log is not None:
+        log.close()
+    log = writer = None
+
+def toggle():
+    if enabled:
+        disable()
+    else:
+        enable()
+
+def reset():
+    global frames, draw_calls
+    current.clear()
+    history.clear()
+    counts.clear()
+    frames = draw_calls = 0
+
+def add(name, seconds):
+    current[name] = current.get(name, 0.0) + seconds
+
+def measure(name, f, *args):
+    """Call f and add the time it took to the phase name"""
+    start = timer()
+    try:
+        return f(*args)
+    finally:
+        add(name, timer() - start)
+
+def frame(calls):
+    """Count a frame estimated to have issued calls draw calls"""
+    global frames, draw_calls
+    frames += 1
+    draw_calls += calls
+
+def end_tick(phases, stats):
+    """Close the current tick. phases are the names of the phases of the
+update of the level in order, stats its entity counts"""
+    global tick, frames, draw_calls, columns, header
+    counts.clear()
+    counts.update(stats)
+    counts['frames'] = frames
+    counts['est_draw_calls'] = (round(float(draw_calls) / frames, 1)
+                                if frames else 0)
+    times = OrderedDict((name, current.get(name, 0.0)) for name in phases)
+    times['tick'] = sum(times.values())
+    for name in EXTRA:
+        times[name] = current.get(name, 0.0)
+    for name, seconds in times.items():
+        if name not in history:
+            history[name] = deque(maxlen = PROFILE_WINDOW)
+        history[name].append(seconds)
+    if columns is None:
+        columns = list(counts)
+    if header:
+        writer.writerow(['n'] + ['{0}_ms'.format(n) for n in times] + columns)
+        header = False
+    writer.writerow([tick] + ['{0:.3f}'.format(t * 1000) for t in times.values()]
+                    + [counts.get(c, '') for c in columns])
+    tick += 1
+    current.clear()
+    frames = draw_calls = 0
+
+def summary():
+    """Lines of the overlay: mean and worst time of every phase over the
+window, the tick against its INTERVAL budget and the counts"""
+    lines = []
+    for name, seconds in history.items():
+        if name == 'tick':
+            continue
+        lines.append('{0:<18} {1:6.2f} {2:6.2f}'.format(
+            name, sum(seconds) * 1000 / len(seconds), max(seconds) * 1000))
+    ticks = history.get('tick')
+    if ticks:
+        mean = sum(ticks) / len(ticks)
+        lines.append('tick {0:.2f}ms worst {1:.2f}ms of {2:.0f}ms ({3:.1%})'
+                     .format(mean * 1000, max(ticks) * 1000, INTERVAL * 1000,
+                             max(ticks) / INTERVAL))
+    lines.append(' '.join('{0} {1}'.format(k, v) for k, v in counts.items()))
+    return lines
@@ -166,6 +166,9 @@ class Rect(object):
             r = (self.right >= o.right and self.left <= o.left and
                     self.bottom <= o.bottom and self.top >= o.top)
             return r
+    def contains_point(self, x, y):
+        """Return true if the point x, y is inside the rectangle."""
+        return self.left <= x <= self.right and self.bottom <= y <= self.top
     def overlaps(self, other):
         """Return true if a rectangle overlaps this rectangle."""
         return (self.right >= other.left and self.left <= other.right and
@@ -19,12 +19,19 @@ import pyglet
 from decorations import autoset
 from rect import Rect
 from constants import WALL_WIDTH, ROOM_FLOOR_COLOR, Color
-from function import vertex_list_from_rect
+from function import quad_from_rect
 from random import randint
 from exception import ImpossiblePathwayException
 
 """Room classes"""
 
+# Draw order of the static geometry, pathway floors cover the walls of the
+# rooms they open into
+ROOM_FLOOR_GROUP = pyglet.graphics.OrderedGroup(0)
+ROOM_WALL_GROUP = pyglet.graphics.OrderedGroup(1)
+PATHWAY_FLOOR_GROUP = pyglet.graphics.OrderedGroup(2)
+PATHWAY_WALL_GROUP = pyglet.graphics.OrderedGroup(3)
+
 class Room(object):
     @autoset
     def __init__(self, x, y, w, h, objects = [], creatures = [],
@@ -34,27 +41,34 @@ class Room(object):
         self.outer_rect = Rect.from_dimensions(x, y,
                                                2 * WALL_WIDTH + w,
                                                2 * WALL_WIDTH + h)
-    def draw(self):
-        self.floor.draw(pyglet.gl.GL_QUAD_STRIP)
-        for w in self.walls:
-            w.draw(pyglet.gl.GL_QUAD_STRIP)
-    def set_visual(self):
-        """Method that sets the visual representation of an object"""
-        self.walls = self.walls_from_rect(self.outer_rect)
+    def set_visual(self, batch):
+        """Method that sets the visual representation of an object. The floor
+and walls are added to the static geometry batch of the level"""
+        self.walls = tuple(
+            quad_from_rect(batch, ROOM_WALL_GROUP,
+                           *(r.dimension() + (Color.ARTICHOKE,)))
+            for r in self.wall_rects())
         d = self.inner_rect.dimension()
-        self.floor = vertex_list_from_rect(d[0], d[1] - 2, d[2], d[3], ROOM_FLOOR_COLOR)
+        self.floor = quad_from_rect(batch, ROOM_FLOOR_GROUP, d[0], d[1] - 2,
+                                    d[2], d[3], ROOM_FLOOR_COLOR)
     def unset_visual(self):
         """Method that unsets all references to the visual representation of an
         object"""
+        self.floor.delete()
+        for w in self.walls:
+            w.delete()
         del self.floor
         del self.walls
+    def wall_rects(self):
+        return self.wall_rects_from_rect(self.outer_rect)
     @classmethod
-    def walls_from_rect(cls, rect, color = Color.ARTICHOKE):
+    def wall_rects_from_rect(cls, rect):
+        """Left, top, bottom and right walls around a rect"""
         x, y, w, h = rect.dimension()
-        left = vertex_list_from_rect(x, y, WALL_WIDTH, WALL_WIDTH + h, color)
-        top = vertex_list_from_rect(x, y + h, w, WALL_WIDTH, color)
-        bottom = vertex_list_from_rect(x, y, w, WALL_WIDTH, color)
-        right = vertex_list_from_rect(x + w, y, WALL_WIDTH, WALL_WIDTH + h, color)
+        left = Rect.from_dimensions(x, y, WALL_WIDTH, WALL_WIDTH + h)
+        top = Rect.from_dimensions(x, y + h, w, WALL_WIDTH)
+        bottom = Rect.from_dimensions(x, y, w, WALL_WIDTH)
+        right = Rect.from_dimensions(x + w, y, WALL_WIDTH, WALL_WIDTH + h)
         return (left, top, bottom, right)
 
 class Pathway(Room):
@@ -77,31 +91,32 @@ class Pathway(Room):
                 w + WALL_WIDTH,
                 h - int(1.45 * self.thickness()))
         self.inner_rect = Rect.from_dimensions(x, y, w, h)
-    def draw(self):
-        self.floor.draw(pyglet.gl.GL_QUAD_STRIP)
-        self.awall.draw(pyglet.gl.GL_QUAD_STRIP)
-        self.bwall.draw(pyglet.gl.GL_QUAD_STRIP)
     @classmethod
     def thickness(cls):
         return WALL_WIDTH * 3
-    def set_visual(self):
-        """Method that sets the visual representation of an object"""
-        self.walls = self.walls_from_rect(self.outer_rect)
+    def wall_rects(self):
+        walls = self.wall_rects_from_rect(self.outer_rect)
         if self.horizontal:
-            self.awall = self.walls[1]
-            self.bwall = self.walls[2]
+            return (walls[1], walls[2])
         else:
-            self.awall = self.walls[0]
-            self.bwall = self.walls[3]
+            return (walls[0], walls[3])
+    def set_visual(self, batch):
+        """Method that sets the visual representation of an object. The floor
+and walls are added to the static geometry batch of the level"""
+        self.walls = tuple(
+            quad_from_rect(batch, PATHWAY_WALL_GROUP,
+                           *(r.dimension() + (Color.ARTICHOKE,)))
+            for r in self.wall_rects())
+        self.awall, self.bwall = self.walls
         d = self.inner_rect.dimension()
-        self.floor = vertex_list_from_rect(d[0], d[1], d[2], d[3], ROOM_FLOOR_COLOR)
+        self.floor = quad_from_rect(batch, PATHWAY_FLOOR_GROUP, d[0], d[1],
+                                    d[2], d[3], ROOM_FLOOR_COLOR)
     def unset_visual(self):
         """Method that unsets all references to the visual representation of an
         object"""
-        del self.floor
+        super(Pathway, self).unset_visual()
         del self.awall
         del self.bwall
-        del self.walls
 
 class MagneticPathway(Pathway):
     def is_left(self):
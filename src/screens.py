@@ -15,7 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with game 3.  If not, see <http://www.gnu.org/licenses/>.
 
-import pyglet
+import pyglet, backend, profiler, allocations
 from util import Container, KeySubscription, Reactable
 from constants import (
     STATS_PANEL_X,
@@ -33,11 +33,16 @@ from constants import (
     HEALTH_BAR_HEIGHT,
     Controls,
     DEBUG,
-    STATUS_PANEL_HEIGHT)
+    STATUS_PANEL_HEIGHT,
+    OBJECT_FONT_FACE,
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT)
 from function import fadeout, vertex_list_from_rect
 from exception import StartGame
 
 class Screen(Container):
+    # How far the game is between two ticks, for drawing
+    alpha = 1.0
     def react(self, key, modifiers):
         for i in self.contents:
             if hasattr(i, 'react'):
@@ -72,12 +77,12 @@ class MenuScreen(Screen):
 
 class LabeledField(Container):
     def __init__(self, label, value_func, x, y):
-        self.label = pyglet.text.Label(
+        self.label = backend.label(
             label + ':',
             font_name=TEXT_FONT,
             font_size=FIELD_FONT_SIZE,
             x=x, y=y)
-        self.value = pyglet.text.Label(
+        self.value = backend.label(
             font_name=TEXT_FONT,
             font_size=FIELD_FONT_SIZE,
             x = x + self.label.content_width + 15,
@@ -106,6 +111,26 @@ class HealthBar(LabeledField):
         bar.draw(pyglet.gl.GL_QUAD_STRIP)
         super(HealthBar, self).draw()
 
+class ProfilerOverlay(object):
+    """Summary of the profiler drawn over the level"""
+    def __init__(self):
+        self.label = backend.label(
+            '',
+            font_name=OBJECT_FONT_FACE,
+            font_size=8,
+            x=5, y=WINDOW_HEIGHT - 5,
+            anchor_y='top',
+            width=WINDOW_WIDTH - 10,
+            multiline=True)
+        self.tick = None
+    def draw(self):
+        if not profiler.enabled:
+            return
+        if self.tick != profiler.tick:
+            self.tick = profiler.tick
+            self.label.text = '\n'.join(profiler.summary())
+        self.label.draw()
+
 class MessageLog(object):
     def __init__(self):
         self.document = pyglet.text.decode_attributed(' ')
@@ -134,7 +159,7 @@ class MessageLog(object):
     def append_formated(self, msg):
         idx = len(self.document.text) + msg.index()
         self.append_message(str(msg))
-        self.document.set_style(idx, idx + 1, {'color' : msg.obj.sprite.color})
+        self.document.set_style(idx, idx + 1, {'color' : msg.obj.color})
     def append_messages(self, msgs):
         for m in msgs:
             if type(m) == str:
@@ -160,11 +185,17 @@ class CommonScreen(Screen, Reactable):
         pfield = LabeledField('Level', pfunc, STATS_PANEL_X, STATS_PANEL_Y - 30)
         self.message_log = MessageLog()
         self.contents = [hfield, pfield, self.message_log]
+        self.overlay = ProfilerOverlay()
+        if allocations.enabled:
+            allocations.watch('labels', lambda: [
+                self.message_log.document, self.message_log.layout,
+                self.overlay.label] + self.contents[:2])
         self.fade = 255
         self.step = FADEOUT_STEP
         self.subs = [
             KeySubscription(self.message_log.page_up, Controls.SCROLL_UP),
-            KeySubscription(self.message_log.page_down, Controls.SCROLL_DOWN)]
+            KeySubscription(self.message_log.page_down, Controls.SCROLL_DOWN),
+            KeySubscription(profiler.toggle, Controls.PROFILE)]
     def react(self, key, modifiers):
         super(CommonScreen, self).react(key, modifiers)
         Reactable.react(self, key, modifiers)
@@ -179,9 +210,10 @@ class CommonScreen(Screen, Reactable):
     def draw(self):
         pyglet.gl.glPushMatrix()
         pyglet.gl.glTranslatef(0.0, STATUS_PANEL_HEIGHT, 0.0)
-        self.state.get_level().draw()
+        self.state.get_level().draw(self.alpha)
         pyglet.gl.glPopMatrix()
         if not DEBUG:
             super(CommonScreen, self).draw()
             if self.fade > 0:
                 fadeout(self.fade)
+        self.overlay.draw()
@@ -0,0 +1,64 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Spatial index for placeable objects"""
+
+from constants import SPATIAL_CELL_SIZE
+
+class SpatialHash(object):
+    """Uniform grid that buckets objects by the cells their rect touches"""
+    def __init__(self, cell_size = SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.index = {}
+    def cell_range(self, rect):
+        """Return the first and last cell columns and rows covered by rect"""
+        s = self.cell_size
+        return (int(rect.left // s), int(rect.bottom // s),
+                int(rect.right // s), int(rect.top // s))
+    def insert(self, obj):
+        r = self.cell_range(obj.rect)
+        self.index[obj] = r
+        for i in range(r[0], r[2] + 1):
+            for j in range(r[1], r[3] + 1):
+                self.cells.setdefault((i, j), []).append(obj)
+    def remove(self, obj):
+        r = self.index.pop(obj, None)
+        if r is None:
+            return
+        for i in range(r[0], r[2] + 1):
+            for j in range(r[1], r[3] + 1):
+                bucket = self.cells[(i, j)]
+                bucket.remove(obj)
+                if not bucket:
+                    del self.cells[(i, j)]
+    def move(self, obj):
+        """Update the cells of an object, inserting it if it is not indexed"""
+        if self.index.get(obj) != self.cell_range(obj.rect):
+            self.remove(obj)
+            self.insert(obj)
+    def query(self, rect):
+        """Return the objects sharing a cell with rect. This is a superset of
+the objects that overlap it"""
+        r = self.cell_range(rect)
+        found = set()
+        for i in range(r[0], r[2] + 1):
+            for j in range(r[1], r[3] + 1):
+                bucket = self.cells.get((i, j))
+                if bucket is not None:
+                    found.update(bucket)
+        return found
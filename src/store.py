@@ -0,0 +1,170 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Creature state kept in columns so that the AI of all the creatures of a
+level is decided with a few array operations.
+
+It needs numpy, without it and on levels with fewer than CREATURE_STORE_MIN
+creatures levels update their creatures one by one with Creature.update. Both
+ways take the same decisions, except that roaming draws from numpy's random
+generator."""
+
+from constants import ROAM_LIST, ROAM_RATE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+COLUMNS = ('x', 'y', 'w', 'h', 'health', 'speed', 'cooldown', 'light_radius',
+           'range', 'pace', 'countdown', 'dx', 'dy', 'chasing', 'roaming',
+           'shown', 'active', 'dist')
+
+class CreatureStore(object):
+    """Columns of the creatures of a level other than the hero. Creatures
+keep working as usual, their health, cooldown, activity and the direction,
+pace and countdown of their roaming are views on the store and set_location
+writes their position back to it"""
+    def __init__(self, creatures, hero):
+        self.hero = hero
+        self.creatures = list(creatures)
+        def column(attr, dtype = int):
+            return numpy.array([getattr(c, attr) for c in self.creatures],
+                               dtype)
+        self.x = column('x')
+        self.y = column('y')
+        self.w = column('w')
+        self.h = column('h')
+        self.health = column('health')
+        self.speed = column('speed')
+        self.cooldown = column('cooldown')
+        self.light_radius = column('light_radius')
+        self.range = column('range')
+        self.pace = column('last_desired_speed')
+        self.countdown = column('change_countdown')
+        self.dx = numpy.array([c.last_desired_direction[0]
+                               for c in self.creatures], int)
+        self.dy = numpy.array([c.last_desired_direction[1]
+                               for c in self.creatures], int)
+        self.chasing = numpy.array(
+            [not c.stationary and c.hostile and c.target is hero
+             for c in self.creatures], bool)
+        self.roaming = numpy.array(
+            [not c.stationary and c.roaming for c in self.creatures], bool)
+        self.shown = numpy.array([c.visible_ for c in self.creatures], bool)
+        self.active = numpy.array([not c.dormant for c in self.creatures],
+                                  bool)
+        # Distance between the centers of each creature and the hero
+        self.dist = numpy.zeros(len(self.creatures))
+        for i, c in enumerate(self.creatures):
+            c.store = self
+            c.row = i
+    def __len__(self):
+        return len(self.creatures)
+    def remove(self, dead):
+        """Drop the rows of the creatures in the dead mask and return them"""
+        removed = []
+        creatures = []
+        for c, d in zip(self.creatures, dead):
+            if d:
+                c.detach()
+                removed.append(c)
+            else:
+                c.row = len(creatures)
+                creatures.append(c)
+        self.creatures = creatures
+        alive = ~dead
+        for name in COLUMNS:
+            setattr(self, name, getattr(self, name)[alive])
+        return removed
+    def remove_dead(self):
+        """Drop and return the creatures without health"""
+        dead = self.health <= 0
+        return self.remove(dead) if dead.any() else []
+    def measure(self, x, y):
+        """Distance from the center of each creature to x, y"""
+        self.dist = numpy.hypot(x - self.x - self.w // 2,
+                                y - self.y - self.h // 2)
+    def active_creatures(self):
+        creatures = self.creatures
+        return [creatures[i] for i in numpy.flatnonzero(self.active)]
+    def active_distances(self):
+        """Dictionary of the active creatures and their distance"""
+        rows = numpy.flatnonzero(self.active)
+        creatures = self.creatures
+        return dict(zip([creatures[i] for i in rows],
+                        self.dist[rows].tolist()))
+    def update_visibility(self, radius):
+        """Show the creatures at most radius away from the hero"""
+        visible = self.dist <= radius
+        for i in numpy.flatnonzero(visible != self.shown):
+            self.creatures[i].visible_ = bool(visible[i])
+        self.shown = visible
+    def update(self, route = None):
+        """Take the decisions of one tick for every creature, the same ones
+Creature.update would take, from the distances of the last measure.
+route(creature) gives the waypoint a chasing creature heads for instead of the
+hero, or None. Dormant creatures are left as they are"""
+        if not self.creatures:
+            return
+        hero = self.hero
+        creatures = self.creatures
+        active = self.active
+        numpy.maximum(self.cooldown - active, 0, self.cooldown)
+        reach = numpy.maximum(self.w, self.h) // 2
+        near = self.chasing & active & (self.dist <= self.range + reach)
+        chase = (self.chasing & active & ~near
+                 & (self.dist <= self.light_radius + reach))
+        roam = self.roaming & active & ~near & ~chase
+        # Chasers head to the hero or to the door on their way to it
+        tx = numpy.where(chase, hero.x, self.x)
+        ty = numpy.where(chase, hero.y, self.y)
+        if route is not None:
+            for i in numpy.flatnonzero(chase):
+                waypoint = route(creatures[i])
+                if waypoint is not None:
+                    tx[i], ty[i] = waypoint
+        sx = numpy.sign(tx - self.x)
+        sy = numpy.sign(ty - self.y)
+        turned = chase & ((self.dx != sx) | (self.dy != sy))
+        self.dx[chase] = sx[chase]
+        self.dy[chase] = sy[chase]
+        self.pace[chase] = self.speed[chase]
+        self.countdown[chase] = self.light_radius[chase]
+        # Roamers keep their direction for a while then maybe pick another
+        self.countdown[roam] -= 1
+        change = (roam & (self.countdown <= 0)
+                  & (numpy.random.random(len(self)) <= ROAM_RATE))
+        n = numpy.count_nonzero(change)
+        if n:
+            self.dx[change] = numpy.random.choice(ROAM_LIST, n)
+            self.dy[change] = numpy.random.choice(ROAM_LIST, n)
+            self.pace[change] = 1
+            self.countdown[change] = self.light_radius[change]
+            turned |= change
+        tx = numpy.where(roam, self.x + self.dx * self.pace, tx)
+        ty = numpy.where(roam, self.y + self.dy * self.pace, ty)
+        nx = self.x + numpy.clip(tx - self.x, -self.speed, self.speed)
+        ny = self.y + numpy.clip(ty - self.y, -self.speed, self.speed)
+        for i in numpy.flatnonzero(near):
+            c = creatures[i]
+            c.set_facing(c.target_direction())
+            c.attack()
+        for i in numpy.flatnonzero(turned):
+            creatures[i].set_facing([int(self.dx[i]), int(self.dy[i])])
+        for i in numpy.flatnonzero(chase | roam):
+            creatures[i].intent(int(nx[i]), int(ny[i]))
@@ -0,0 +1,65 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Trace of the game loop in the Chrome trace event format.
+
+Set the TRACE_VARIABLE environment variable to a file name to record the
+spans of the updates, level phases, event dispatches, level transitions, saves
+and drawing. The trace is written there when the game exits and can be opened
+with chrome://tracing or any viewer of the format. Unset, every hook returns
+after checking the enabled flag."""
+
+import atexit, functools, json, os, timeit
+from constants import TRACE_VARIABLE
+
+timer = timeit.default_timer
+path = os.environ.get(TRACE_VARIABLE)
+enabled = bool(path)
+spans = []
+
+def begin(name, category = 'game'):
+    if enabled:
+        spans.append({'name': name, 'cat': category, 'ph': 'B',
+                      'ts': timer() * 1e6, 'pid': 1, 'tid': 1})
+
+def end(name, category = 'game'):
+    if enabled:
+        spans.append({'name': name, 'cat': category, 'ph': 'E',
+                      'ts': timer() * 1e6, 'pid': 1, 'tid': 1})
+
+def traced(name, category = 'game'):
+    """Decoration that records each call of a function as a span"""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return f(*args, **kwargs)
+            begin(name, category)
+            try:
+                return f(*args, **kwargs)
+            finally:
+                end(name, category)
+        return wrapper
+    return decorator
+
+def write():
+    """Write the spans recorded so far to path"""
+    if enabled and spans:
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': spans, 'displayTimeUnit': 'ms'}, f)
+
+atexit.register(write)
@@ -0,0 +1,74 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Triggers of a level that have not fired yet"""
+
+from spatial import SpatialHash
+from events import HeroMoved
+
+class TriggerEngine(object):
+    """Evaluates each trigger only when it may fire. Triggers on a region are
+kept in a spatial index looked up when the hero moves, the ones whose
+predicate lists events are evaluated when those events are dispatched and
+the others are polled every tick. Triggers leave once they fired"""
+    def __init__(self, triggers):
+        self.order = {}
+        self.polled = []
+        self.subscribed = {}
+        self.regions = SpatialHash()
+        for t in triggers:
+            self.add(t)
+    def __len__(self):
+        return len(self.order)
+    def add(self, trigger):
+        if trigger.used:
+            return
+        self.order[trigger] = len(self.order)
+        predicate = trigger.predicate
+        if predicate.region is not None:
+            self.regions.insert(trigger)
+        elif predicate.events:
+            for e in predicate.events:
+                self.subscribed.setdefault(e, []).append(trigger)
+        else:
+            self.polled.append(trigger)
+    def remove(self, trigger):
+        del self.order[trigger]
+        self.regions.remove(trigger)
+        if trigger in self.polled:
+            self.polled.remove(trigger)
+        for e in trigger.predicate.events:
+            if trigger in self.subscribed.get(e, ()):
+                self.subscribed[e].remove(trigger)
+    def evaluate(self, triggers):
+        """Update the triggers in the order they were added and drop the
+ones that fired"""
+        for t in sorted(triggers, key=self.order.get):
+            t.update()
+            if t.used:
+                self.remove(t)
+    def update(self):
+        """Poll the triggers that do not wait for events"""
+        if self.polled:
+            self.evaluate(self.polled)
+    def notify(self, ev):
+        """Evaluate the triggers waiting for the event"""
+        triggers = list(self.subscribed.get(type(ev), ()))
+        if isinstance(ev, HeroMoved):
+            triggers.extend(self.regions.query(ev.hero.rect))
+        if triggers:
+            self.evaluate(triggers)
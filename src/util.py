@@ -26,8 +26,11 @@ from exception import (
     SubscriptionFound,
     AnimationEnd)
 from function import vertex_list_from_rect
+from events import HeroMoved
 
 flatten = itertools.chain.from_iterable
+# Released hitboxes of each hitbox class, ready to be reused
+hitbox_pools = {}
 
 class KeySubscription(object):
     """Keyboard inputs combination that trigger an event"""
@@ -43,6 +46,7 @@ class KeySubscription(object):
 
 class Drawable(object):
     """Anything that can be drawn"""
+    __slots__ = ()
     @autoset
     def __init__(self, sprite):
         pass
@@ -69,15 +73,39 @@ class Reactable(object):
             i.react(key, modifiers)
 
 class Hitbox(Drawable):
+    """Area that hurts the creatures it overlaps during one tick. Get them
+with acquire and give them back with release so that they are reused"""
     @autoset
     def __init__(self, origin, x, y, w, h):
+        self.rect = Rect.from_dimensions(x, y, w, h)
+        self.sprite = None
+        self.reset(origin, x, y, w, h)
+    @classmethod
+    def acquire(cls, origin, x, y, w, h):
+        pool = hitbox_pools.get(cls)
+        if not pool:
+            return cls(origin, x, y, w, h)
+        hitbox = pool.pop()
+        hitbox.reset(origin, x, y, w, h)
+        return hitbox
+    def release(self):
+        if self.sprite is not None:
+            self.sprite.delete()
+            self.sprite = None
+        self.origin = None
+        hitbox_pools.setdefault(type(self), []).append(self)
+    def reset(self, origin, x, y, w, h):
+        self.origin = origin
+        self.x, self.y, self.w, self.h = x, y, w, h
         self.strength = origin.strength
         self.remove = False
-        self.sprite = vertex_list_from_rect(x, y, w, h)
-        self.rect = Rect.from_dimensions(x, y, w, h)
+        self.rect.set_points_from_dimensions(x, y, w, h)
     def hit(self, creature):
         return self.rect.overlaps(creature.rect)
     def draw(self):
+        """Only drawn when debugging, the geometry is made on the first draw"""
+        if self.sprite is None:
+            self.sprite = vertex_list_from_rect(self.x, self.y, self.w, self.h)
         self.sprite.draw(pyglet.gl.GL_QUAD_STRIP)
 
 class MeleeHitbox(Hitbox):
@@ -151,11 +179,17 @@ class RunOnceTrigger(object):
             if self.predicate.eval():
                 self.used = True
                 self.reaction(self.objects)
+    @property
+    def rect(self):
+        """Region of the predicate, for the region index of the level"""
+        return self.predicate.region
 
 class Predicate(object):
-    """A condition of a trigger"""
+    """A condition of a trigger. It is polled every tick unless events lists
+the event types after which it has to be evaluated"""
+    region = None
     @autoset
-    def __init__(self, object_ids, fun):
+    def __init__(self, object_ids, fun, events = ()):
         pass
     def eval(self):
         return self.fun(self.objects)
@@ -166,4 +200,5 @@ class HeroEnterRegion(Predicate):
         rect = Rect.from_dimensions(x, y, w, h)
         def fun(objects):
             return rect.overlaps(objects[0].rect)
-        super(HeroEnterRegion, self).__init__([HERO_ID], fun)
+        super(HeroEnterRegion, self).__init__([HERO_ID], fun, (HeroMoved,))
+        self.region = rect
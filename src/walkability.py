@@ -0,0 +1,107 @@
+# Copyright 2013 by akuji
+#
+# This file is part of game 3.
+#
+# game 3 is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# game 3 is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with game 3.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Walkable area of a level"""
+
+from array import array
+
+class WalkMap(object):
+    """Rasterized union of the inner rects of rooms and pathways.
+
+Every integer point of the level is a cell. A rect is walkable when all the
+cells it covers are inside some room or pathway, which is answered with a
+summed area table in constant time."""
+    def __init__(self, places):
+        self.build(places)
+    def build(self, places):
+        """Rasterize all places from scratch"""
+        rects = [p.inner_rect for p in places]
+        if not rects:
+            rects = [None]
+            self.left = self.bottom = 0
+            self.width = self.height = 0
+        else:
+            self.left = int(min(r.left for r in rects))
+            self.bottom = int(min(r.bottom for r in rects))
+            self.width = int(max(r.right for r in rects)) - self.left + 1
+            self.height = int(max(r.top for r in rects)) - self.bottom + 1
+        self.cells = bytearray(self.width * self.height)
+        self.sums = array('i', [0]) * ((self.width + 1) * (self.height + 1))
+        for r in rects:
+            if r is not None:
+                self.paint(r.left, r.bottom, r.right, r.top, 1)
+        self.sum_rows(0)
+    def inside_bounds(self, rect):
+        return (self.left <= rect.left and
+                rect.right < self.left + self.width and
+                self.bottom <= rect.bottom and
+                rect.top < self.bottom + self.height)
+    def paint(self, left, bottom, right, top, value):
+        """Set every cell of the given inclusive region to value"""
+        l = max(int(left) - self.left, 0)
+        r = min(int(right) - self.left, self.width - 1)
+        b = max(int(bottom) - self.bottom, 0)
+        t = min(int(top) - self.bottom, self.height - 1)
+        if l > r or b > t:
+            return
+        run = bytearray([value]) * (r - l + 1)
+        for j in range(b, t + 1):
+            start = j * self.width + l
+            self.cells[start:start + len(run)] = run
+    def sum_rows(self, first):
+        """Recompute the summed area table from row first upwards"""
+        w = self.width
+        cells = self.cells
+        sums = self.sums
+        for j in range(first, self.height):
+            above = j * (w + 1)
+            row = above + w + 1
+            base = j * w
+            running = 0
+            for i in range(w):
+                running += cells[base + i]
+                sums[row + i + 1] = sums[above + i + 1] + running
+    def update(self, rect, places):
+        """Rasterize again the strip of the map covered by rect, usually the
+inner rect of a pathway that was added or removed"""
+        if not self.inside_bounds(rect):
+            self.build(places)
+            return
+        self.paint(rect.left, rect.bottom, rect.right, rect.top, 0)
+        for p in places:
+            r = p.inner_rect
+            if r.overlaps(rect):
+                self.paint(max(r.left, rect.left), max(r.bottom, rect.bottom),
+                           min(r.right, rect.right), min(r.top, rect.top), 1)
+        self.sum_rows(max(int(rect.bottom) - self.bottom, 0))
+    def count(self, left, bottom, right, top):
+        """Number of walkable cells in an inclusive region inside the bounds"""
+        w = self.width + 1
+        l = left - self.left
+        r = right - self.left + 1
+        b = (bottom - self.bottom) * w
+        t = (top - self.bottom + 1) * w
+        s = self.sums
+        return s[t + r] - s[b + r] - s[t + l] + s[b + l]
+    def contains(self, rect):
+        """True if every point of rect is walkable"""
+        if not self.inside_bounds(rect):
+            return False
+        left, bottom = int(rect.left), int(rect.bottom)
+        right, top = int(rect.right), int(rect.top)
+        area = (right - left + 1) * (top - bottom + 1)
+        return self.count(left, bottom, right, top) == area